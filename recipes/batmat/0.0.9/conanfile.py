@@ -1,16 +1,92 @@
 import os
 
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.build import can_run
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
 from conan.tools.files import (
     apply_conandata_patches,
+    copy,
     export_conandata_patches,
     get,
+    mkdir,
+    rename,
+    rmdir,
     save,
 )
 from conan.tools.scm import Version
 
+# guanaqo options enabled by each value of the profiling option
+profiling_guanaqo_options = {
+    "off": [],
+    "tracing": ["with_tracing"],
+    "perfetto": ["with_perfetto"],
+    "itt": ["with_itt"],
+}
+
+# Default vector lengths (double, float) for each instruction set: only the
+# vector lengths that map to native SIMD registers are instantiated
+isa_vector_lengths = {
+    "scalar": ("1", "1"),
+    "sse2": ("1,2", "1,4"),
+    "avx": ("1,4", "1,4,8"),
+    "avx2": ("1,4", "1,4,8"),
+    "avx512": ("1,4,8", "1,4,8,16"),
+    "neon": ("1,2", "1,4"),
+    "sve256": ("1,4", "1,4,8"),
+}
+
+# Maps the -march/-mcpu flags to the instruction set
+x86_cpu_to_isa = {
+    "x86-64": "sse2",
+    "x86-64-v2": "sse2",
+    "x86-64-v3": "avx2",
+    "x86-64-v4": "avx512",
+    "nehalem": "sse2",
+    "westmere": "sse2",
+    "sandybridge": "avx",
+    "ivybridge": "avx",
+    "haswell": "avx2",
+    "broadwell": "avx2",
+    "skylake": "avx2",
+    "alderlake": "avx2",
+    "raptorlake": "avx2",
+    "meteorlake": "avx2",
+    "skylake-avx512": "avx512",
+    "cascadelake": "avx512",
+    "cooperlake": "avx512",
+    "icelake-client": "avx512",
+    "icelake-server": "avx512",
+    "tigerlake": "avx512",
+    "rocketlake": "avx512",
+    "sapphirerapids": "avx512",
+    "emeraldrapids": "avx512",
+    "graniterapids": "avx512",
+    "bdver1": "avx",
+    "bdver2": "avx",
+    "bdver3": "avx",
+    "bdver4": "avx2",
+    "znver1": "avx2",
+    "znver2": "avx2",
+    "znver3": "avx2",
+    "znver4": "avx512",
+    "znver5": "avx512",
+}
+
+# x86-64 microarchitecture levels supported by the glibc-hwcaps loader, and
+# the instruction set used for the default vector lengths of each level
+isa_level_to_isa = {
+    "x86-64": "sse2",
+    "x86-64-v2": "sse2",
+    "x86-64-v3": "avx2",
+    "x86-64-v4": "avx512",
+}
+
+x86_archs = ["x86", "x86_64"]
+arm_archs = ["armv7hf", "armv8", "armv8_32", "armv8.3", "arm64ec"]
+# 32-bit ARM NEON has no double precision vector instructions
+arm32_archs = ["armv7hf", "armv8_32"]
+
 
 class BatmatRecipe(ConanFile):
     name = "batmat"
@@ -23,6 +99,8 @@ class BatmatRecipe(ConanFile):
     description = "Fast linear algebra routines for batches of small matrices."
     topics = "scientific software"
 
+    python_requires = "tttapa-conan-utils/1.0.0"
+
     # Binary configuration
     settings = "os", "compiler", "build_type", "arch"
     # https://github.com/conan-io/conan/issues/19108
@@ -37,44 +115,187 @@ class BatmatRecipe(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
-        "vector_lengths_double": ["ANY"],  # affects API
-        "vector_lengths_float": ["ANY"],  # affects API
-        "dtypes": ["double", "double,float", "ANY"],  # affects API
+        "vector_lengths_double": [None, "ANY"],  # affects API
+        "vector_lengths_float": [None, "ANY"],  # affects API
+        "isa": [None] + list(isa_vector_lengths),  # only affects the default vector lengths
+        "isa_levels": [None, "ANY"],
+        "dtypes": [None, "double", "double,float", "ANY"],  # affects API
+        "openmp_runtime": ["auto", "libgomp", "libomp"],  # affects ABI
+        "profiling": list(profiling_guanaqo_options),  # affects ABI
     } | {k: [True, False] for k in bool_batmat_options}
     default_options = {
         "shared": False,
         "fPIC": True,
-        "dtypes": "double",
+        "dtypes": None,
+        "vector_lengths_double": None,
+        "vector_lengths_float": None,
+        "isa": None,
+        "isa_levels": None,
+        "openmp_runtime": "auto",
+        "profiling": "off",
     } | bool_batmat_options
 
     def config_options(self):
         if self.settings.get_safe("os") == "Windows":
             self.options.rm_safe("fPIC")
-        # Set architecture-dependent defaults for vector lengths
-        arch = str(self.settings.arch)
-        if arch in ["armv7hf", "armv8", "armv8_32", "armv8.3", "arm64ec"]:
-            # ARM NEON: 128-bit vectors (2x double)
-            self.options.vector_lengths_double = "1,2,4"
-            self.options.vector_lengths_float = "1,4,8"
-        elif arch in ["x86_64"]:
-            # x86_64 AVX2/AVX-512: 256-bit and 512-bit vectors (4x and 8x double)
-            self.options.vector_lengths_double = "1,4,8"
-            self.options.vector_lengths_float = "1,4,8,16"
-        else:
-            # Conservative defaults for other architectures
-            self.options.vector_lengths_double = "1,2,4"
-            self.options.vector_lengths_float = "1,4,8"
 
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if self.options.dtypes.value is None:
+            profile = self.conf.get("user.precision:profile", default="double", choices=["double", "float", "mixed"])
+            self.options.dtypes = "double,float" if profile == "mixed" else profile
+        # Set ISA-dependent defaults for vector lengths
+        isa = self._isa
+        if isa is None:
+            # Conservative defaults for other architectures
+            vl_double, vl_float = "1,2,4", "1,4,8"
+        else:
+            vl_double, vl_float = isa_vector_lengths[isa]
+            if isa == "neon" and str(self.settings.arch) in arm32_archs:
+                vl_double = "1"
+        if self.options.vector_lengths_double.value is None:
+            self.options.vector_lengths_double = vl_double
+        if self.options.vector_lengths_float.value is None:
+            self.options.vector_lengths_float = vl_float
         if self.options.get_safe("with_benchmarks"):
             self.options["guanaqo/*"].with_blas = True
+            self.options["hyhound/*"].profiling = self.options.profiling
+        # Enable the matching instrumentation in guanaqo
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            setattr(self.options["guanaqo/*"], opt, True)
+        if self.options.with_openmp:
+            # Use a single OpenMP runtime in the whole graph
+            self.options["guanaqo/*"].openmp_runtime = self.options.openmp_runtime
+        else:
+            self.options.rm_safe("openmp_runtime")
+
+    @property
+    def _isa(self):
+        """Instruction set used to select the default vector lengths: the isa
+        option, or the ISA implied by the compiler flags, toolchain or arch."""
+        if self.options.isa:
+            return str(self.options.isa)
+        if self._isa_levels:
+            # The vector lengths are shared by all levels, so optimize them for the highest one
+            return isa_level_to_isa.get(self._isa_levels[-1])
+        arch = str(self.settings.arch)
+        # -mcpu is more specific than -march (and the only option on some ARM compilers)
+        cpu, sve_bits = None, None
+        for flags in ["tools.build:cflags", "tools.build:cxxflags"]:
+            for flag in self.conf.get(flags, default=[], check_type=list):
+                if flag.startswith("-march=") and not cpu:
+                    cpu = flag.split("=", 1)[1]
+                elif flag.startswith("-mcpu="):
+                    cpu = flag.split("=", 1)[1]
+                elif flag.startswith("-msve-vector-bits="):
+                    sve_bits = flag.split("=", 1)[1]
+        if cpu and cpu != "native":
+            # Ignore feature modifiers such as +crypto, except for SVE
+            base, *features = cpu.split("+")
+            if arch in x86_archs and base in x86_cpu_to_isa:
+                return x86_cpu_to_isa[base]
+            if arch in arm_archs:
+                # Fixed-size SVE vectors require -msve-vector-bits
+                has_sve = "sve" in features or "sve2" in features or base == "neoverse-v1"
+                if sve_bits == "256" and has_sve:
+                    return "sve256"
+                return "neon"
+            self.output.warning(f'Could not infer the ISA from unknown CPU "{cpu}" in the compiler flags')
+        toolchain_cpu = self.settings.get_safe("arch.toolchain-cpu")
+        if arch == "armv6" or toolchain_cpu == "armv6":
+            return "scalar"  # VFP only
+        if toolchain_cpu in ["aarch64", "armv8", "armv7"] or arch in arm_archs:
+            return "neon"
+        if arch in x86_archs:
+            return "sse2"  # Baseline without -march flags
+        return None
+
+    @property
+    def _isa_levels(self):
+        """Microarchitecture levels to build the libraries for, lowest first."""
+        if not self.options.isa_levels:
+            return []
+        levels = [lvl.strip() for lvl in str(self.options.isa_levels).split(",")]
+        order = list(isa_level_to_isa)
+        return sorted(set(levels), key=lambda lvl: order.index(lvl) if lvl in order else -1)
+
+    @property
+    def _openmp_runtime(self):
+        runtime = self.options.get_safe("openmp_runtime")
+        if runtime is None:
+            return None
+        if runtime == "auto":
+            return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self)
+        return str(runtime)
+
+    def _validate_openmp_runtime(self):
+        runtime = self._openmp_runtime
+        if runtime == "libgomp" and self.settings.compiler != "gcc":
+            raise ConanInvalidConfiguration(f'"{self.name}/*:openmp_runtime=libgomp" option requires GCC')
+        if runtime == "libomp" and self.settings.compiler not in ["gcc", "clang", "apple-clang"]:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libomp" option requires GCC or Clang'
+            )
+        if self._openmp_runtime == "libgomp" and "llvm-openmp" in self.dependencies.host:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libgomp" conflicts with llvm-openmp in the dependency graph, '
+                f'use "{self.name}/*:openmp_runtime=libomp" to use a single OpenMP runtime'
+            )
+
+    def validate(self):
+        self._validate_openmp_runtime()
+        guanaqo = self.dependencies["guanaqo"]
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            if not guanaqo.options.get_safe(opt):
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:profiling={self.options.profiling}" option requires "guanaqo/*:{opt}=True"'
+                )
+        if self.options.isa_levels:
+            unsupported = [lvl for lvl in self._isa_levels if lvl not in isa_level_to_isa]
+            if unsupported:
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:isa_levels" contains unsupported levels {unsupported}, '
+                    f"supported levels are {list(isa_level_to_isa)}"
+                )
+            if self.settings.os != "Linux" or self.settings.arch != "x86_64":
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:isa_levels" option requires Linux on x86_64 (glibc-hwcaps)'
+                )
+            if not self.options.shared:
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:isa_levels" option requires "{self.name}/*:shared=True"'
+                )
+            min_compiler = {"gcc": "11", "clang": "12"}.get(str(self.settings.compiler))
+            if min_compiler is None or Version(self.settings.compiler.version) < min_compiler:
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:isa_levels" option requires GCC 11 or Clang 12 or later'
+                )
+        isa = self.options.isa
+        if isa in ["sse2", "avx", "avx2", "avx512"] and self.settings.arch not in x86_archs:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:isa={isa}" option requires an x86 arch')
+        if isa in ["neon", "sve256"] and self.settings.arch not in arm_archs:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:isa={isa}" option requires an ARM arch')
+
+    def package_id(self):
+        # Record the OpenMP runtime that was actually selected
+        if self.info.options.get_safe("openmp_runtime") == "auto":
+            utils = self.python_requires["tttapa-conan-utils"].module
+            default = utils.default_openmp_runtime.get(str(self.info.settings.compiler), "auto")
+            self.info.options.openmp_runtime = self.conf.get("user.openmp:runtime", default=default)
+        # Only used to select the defaults of the vector lengths, which are part of the package ID
+        del self.info.options.isa
+        if self.info.options.isa_levels:
+            # The order of the levels does not matter
+            order = list(isa_level_to_isa)
+            levels = {lvl.strip() for lvl in str(self.info.options.isa_levels).split(",")}
+            self.info.options.isa_levels = ",".join(sorted(levels, key=order.index))
 
     def export_sources(self):
         commit = self.conan_data["commits"][self.version]
         save(self, os.path.join(self.export_sources_folder, "commit.txt"), commit)
         export_conandata_patches(self)
+        copy(self, "install-benchmarks.cmake", self.recipe_folder, self.export_sources_folder)
 
     def source(self):
         sources = self.conan_data["sources"][self.version]
@@ -96,8 +317,9 @@ class BatmatRecipe(ConanFile):
         if self.options.get_safe("with_benchmarks"):
             self.requires("benchmark/1.9.4")
             self.requires("hyhound/1.1.1")
-        if self.options.get_safe("with_openmp") and self.settings.compiler == "clang":
-            self.requires(f"llvm-openmp/[~{self.settings.compiler.version}]")
+        if self._openmp_runtime == "libomp":
+            # libomp also implements the GOMP ABI used by GCC
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self))
         if self.options.get_safe("with_gsi_hpc_simd"):
             self.requires("gsi-hpc-simd/tttapa.20250625", transitive_headers=True)
         if self.options.get_safe("with_blasfeo"):
@@ -131,8 +353,26 @@ class BatmatRecipe(ConanFile):
             tc.variables["BATMAT_DEFAULT_INDEX_TYPE"] = index_type
         else:
             tc.variables["BATMAT_DENSE_INDEX_TYPE"] = index_type
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            tc.variables["BATMAT_" + opt.upper()] = True
         if can_run(self):
             tc.variables["BATMAT_FORCE_TEST_DISCOVERY"] = True
+        if self._isa_levels:
+            # Compile everything for the level selected by BATMAT_CONAN_ISA_LEVEL
+            # (the baseline level by default, see build())
+            isa_level_cmake = os.path.join(self.generators_folder, "batmat-isa-level.cmake")
+            save(
+                self,
+                isa_level_cmake,
+                "include_guard(GLOBAL)\n"
+                "add_compile_options(-march=${BATMAT_CONAN_ISA_LEVEL})\n",
+            )
+            tc.variables["BATMAT_CONAN_ISA_LEVEL"] = self._isa_levels[0]
+            tc.variables["CMAKE_PROJECT_INCLUDE"] = isa_level_cmake
+        if self.options.get_safe("with_benchmarks"):
+            # The benchmark executables are not installed by CMake
+            install_benchmarks = os.path.join(self.export_sources_folder, "install-benchmarks.cmake")
+            tc.cache_variables["CMAKE_PROJECT_batmat_INCLUDE"] = install_benchmarks.replace("\\", "/")
         tc.generate()
 
     def build(self):
@@ -140,11 +380,67 @@ class BatmatRecipe(ConanFile):
         cmake.configure()
         cmake.build()
         cmake.test()
+        # Build the libraries again for the higher levels. The tests are not
+        # built, since the build machine may not support these instructions.
+        utils = self.python_requires["tttapa-conan-utils"].module
+        for level in self._isa_levels[1:]:
+            variables = {
+                "BATMAT_CONAN_ISA_LEVEL": level,
+                "BUILD_TESTING": False,
+                "BATMAT_FORCE_TEST_DISCOVERY": False,
+                "BATMAT_WITH_BENCHMARKS": False,
+            }
+            level_folder = os.path.join(self.build_folder, level)
+            utils.cmake_configure(self, level_folder, variables=variables)
+            utils.cmake_build(self, level_folder)
 
     def package(self):
         cmake = CMake(self)
         cmake.install()
+        # The dynamic loader of glibc (2.33 or later) picks the libraries in
+        # lib/glibc-hwcaps/<level> over the baseline libraries in lib if the
+        # CPU supports that level
+        utils = self.python_requires["tttapa-conan-utils"].module
+        for level in self._isa_levels[1:]:
+            utils.cmake_install(self, os.path.join(self.build_folder, level), os.path.join(self.package_folder, level))
+            hwcaps_dir = os.path.join(self.package_folder, "lib", "glibc-hwcaps", level)
+            mkdir(self, hwcaps_dir)
+            level_lib_dir = os.path.join(self.package_folder, level, "lib")
+            for f in os.listdir(level_lib_dir):
+                if ".so" in f:
+                    rename(self, os.path.join(level_lib_dir, f), os.path.join(hwcaps_dir, f))
+            rmdir(self, os.path.join(self.package_folder, level))
 
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "none")
-        self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "batmat"))
+        # Thread budget shared by all packages in the graph
+        if self.options.get_safe("with_openmp"):
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
+        with_benchmarks = self.options.get_safe("with_benchmarks")
+        if not self._isa_levels and not with_benchmarks:
+            self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "batmat"))
+            return
+        benchmark_deps = ["benchmark", "hyhound"] if with_benchmarks else []
+        main = self.cpp_info.components["batmat"]
+        main.builddirs.append(os.path.join("lib", "cmake", "batmat"))
+        main.requires = [
+            f"{dep.ref.name}::{dep.ref.name}"
+            for req, dep in self.dependencies.items()
+            if req.direct and not req.build and not req.test and dep.ref.name not in benchmark_deps
+        ]
+        if with_benchmarks:
+            benchmarks = self.cpp_info.components["benchmarks"]
+            benchmarks.libdirs = []
+            benchmarks.includedirs = []
+            benchmarks.bindirs = ["bin"]
+            benchmarks.requires = ["batmat"] + [f"{name}::{name}" for name in benchmark_deps]
+        # The libraries of the higher levels are selected at runtime by the
+        # dynamic loader, so their directories must not be added to the
+        # library search path
+        for level in self._isa_levels[1:]:
+            component = self.cpp_info.components[f"isa_{level.replace('-', '_')}"]
+            component.libdirs = []
+            component.bindirs = []
+            component.includedirs = []
+            component.resdirs = [os.path.join("lib", "glibc-hwcaps", level)]
+            component.requires = ["batmat"]
@@ -1,8 +1,14 @@
+import glob
 import os
+import re
+import shlex
+import shutil
+from io import StringIO
 
 from conan import ConanFile
 from conan.tools.cmake import CMake, cmake_layout
 from conan.tools.build import can_run
+from conan.tools.files import save
 
 
 class HyhoundTestConan(ConanFile):
@@ -20,7 +26,80 @@ class HyhoundTestConan(ConanFile):
     def layout(self):
         cmake_layout(self)
 
+    @property
+    def _benchmark(self):
+        if not self.conf.get("user.batmat:benchmark", default=False, check_type=bool):
+            return False
+        if not self.dependencies[self.tested_reference_str].options.with_benchmarks:
+            self.output.warning("Skipping batmat benchmarks: they require with_benchmarks=True")
+            return False
+        return True
+
     def test(self):
+        self._check_precision()
         if can_run(self):
             cmd = os.path.join(self.cpp.build.bindir, "example")
             self.run(cmd, env="conanrun")
+            if self._benchmark:
+                self._run_benchmarks()
+
+    def _check_precision(self):
+        # With user.precision:profile=float, no batmat template may be instantiated for double
+        batmat = self.dependencies[self.tested_reference_str]
+        if str(batmat.options.dtypes) != "float" or not shutil.which("nm"):
+            return
+        nm = "nm -C -D --defined-only" if batmat.options.shared else "nm -C --defined-only"
+        libdirs = batmat.cpp_info.aggregated_components().libdirs
+        libs = [lib for d in libdirs for lib in glob.glob(os.path.join(d, "libbatmat*"))]
+        assert libs, f"batmat libraries not found in {libdirs}"
+        for lib in libs:
+            self.run(f"{nm} {shlex.quote(lib)}", output := StringIO())
+            assert not re.search(r"\bbatmat::[^(\n]*<double\b", output.getvalue()), f"{lib} contains double precision symbols"
+
+    @property
+    def _benchmark_output_dir(self):
+        output_dir = self.conf.get("user.batmat:benchmark_output_dir", check_type=str)
+        if not output_dir:
+            self.output.warning("Writing the batmat benchmark results to the test_package build folder, which is "
+                                "removed by the next conan test or create. Set user.batmat:benchmark_output_dir to keep them.")
+            return self.build_folder
+        return os.path.abspath(output_dir)
+
+    def _run_benchmarks(self):
+        batmat = self.dependencies[self.tested_reference_str]
+        output_dir = self._benchmark_output_dir
+        benchmark_filter = self.conf.get("user.batmat:benchmark_filter", default=None, check_type=str)
+        min_time = self.conf.get("user.batmat:benchmark_min_time", default=None, check_type=str)
+        # Record the configuration in the context of the JSON output
+        context = {
+            "batmat_version": str(batmat.ref.version),
+            "build_type": str(self.settings.build_type),
+            "compiler": f"{self.settings.compiler} {self.settings.compiler.version}",
+            "arch": str(self.settings.arch),
+        }
+        for opt in ["dtypes", "vector_lengths_double", "vector_lengths_float", "isa", "isa_levels",
+                    "with_openmp", "with_gsi_hpc_simd", "with_blasfeo", "shared"]:
+            value = batmat.options.get_safe(opt)
+            if value is not None and value.value is not None:
+                context[opt] = str(value)
+        bindirs = batmat.cpp_info.components["benchmarks"].bindirs
+        # Only the benchmarks are installed as executables (shared libraries
+        # may be installed to bin on Windows)
+        executables = sorted(
+            exe for d in bindirs for exe in glob.glob(os.path.join(d, "*"))
+            if os.path.splitext(exe)[1] in ("", ".exe") and os.access(exe, os.X_OK)
+        )
+        assert executables, f"No batmat benchmarks found in {bindirs}"
+        for exe in executables:
+            # Google Benchmark splits the context on commas
+            context_arg = ",".join(f"{k}={v.replace(',', ';')}" for k, v in context.items())
+            args = [exe, "--benchmark_format=json", f"--benchmark_context={context_arg}"]
+            if benchmark_filter:
+                args.append(f"--benchmark_filter={benchmark_filter}")
+            if min_time:
+                args.append(f"--benchmark_min_time={min_time}")
+            self.run(" ".join(shlex.quote(a) for a in args), stdout=(output := StringIO()), env="conanrun")
+            name = os.path.splitext(os.path.basename(exe))[0]
+            result = os.path.join(output_dir, f"batmat-{batmat.ref.version}-{name}.json")
+            save(self, result, output.getvalue())
+            self.output.info(f"batmat benchmark results: {result}")
@@ -1,6 +1,52 @@
 #include <batmat-version.h>
 #include <iostream>
 
+#if defined(__linux__)
+#include <dlfcn.h>
+#include <link.h>
+#include <climits>
+#include <cstdlib>
+#include <set>
+#include <string>
+
+// Returns the paths of all OpenMP runtimes loaded in this process. Multiple
+// runtimes each start their own thread pool, oversubscribing the CPU.
+std::set<std::string> loaded_openmp_runtimes() {
+    std::set<std::string> runtimes;
+    dl_iterate_phdr(
+        [](dl_phdr_info *info, size_t, void *data) {
+            std::string path = info->dlpi_name ? info->dlpi_name : "";
+            auto name = path.substr(path.find_last_of('/') + 1);
+            for (const char *runtime : {"libgomp", "libomp", "libiomp5"}) {
+                if (name.rfind(runtime, 0) == 0) {
+                    // Resolve symlinks such as libgomp.so -> libomp.so
+                    char resolved[PATH_MAX];
+                    if (realpath(path.c_str(), resolved))
+                        path = resolved;
+                    static_cast<std::set<std::string> *>(data)->insert(path);
+                }
+            }
+            return 0;
+        },
+        &runtimes);
+    return runtimes;
+}
+#endif
+
 int main() {
     std::cout << BATMAT_VERSION_FULL << " (" << batmat_commit_hash << ")\n";
+#if defined(__linux__)
+    // With the isa_levels option, the dynamic loader selects the batmat
+    // library from lib/glibc-hwcaps/<level> that matches the CPU
+    Dl_info info;
+    if (dladdr(static_cast<const void *>(&batmat_commit_hash), &info) && info.dli_fname)
+        std::cout << "Loaded from " << info.dli_fname << "\n";
+    auto runtimes = loaded_openmp_runtimes();
+    for (const auto &runtime : runtimes)
+        std::cout << "OpenMP runtime: " << runtime << "\n";
+    if (runtimes.size() > 1) {
+        std::cerr << "Error: multiple OpenMP runtimes were loaded\n";
+        return 1;
+    }
+#endif
 }
@@ -23,6 +23,8 @@ class BatmatRecipe(ConanFile):
     description = "Fast linear algebra routines for batches of small matrices."
     topics = "scientific software"
 
+    python_requires = "tttapa-conan-utils/1.0.0"
+
     # Binary configuration
     settings = "os", "compiler", "build_type", "arch"
     # https://github.com/conan-io/conan/issues/19108
@@ -32,15 +34,18 @@ class BatmatRecipe(ConanFile):
         "with_benchmarks": False,
         "with_cpu_time": False,  # affects ABI
         "with_gsi_hpc_simd": False,  # affects ABI
-        "with_single": False,  # affects ABI
     }
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "openmp_runtime": ["auto", "libgomp", "libomp"],  # affects ABI
+        "with_single": [None, True, False],  # affects ABI
     } | {k: [True, False] for k in bool_batmat_options}
     default_options = {
         "shared": False,
         "fPIC": True,
+        "openmp_runtime": "auto",
+        "with_single": None,
     } | bool_batmat_options
 
     def config_options(self):
@@ -50,7 +55,20 @@ class BatmatRecipe(ConanFile):
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if self.options.with_single.value is None:
+            profile = self.conf.get("user.precision:profile", default="double", choices=["double", "float", "mixed"])
+            self.options.with_single = profile != "double"
+            if profile == "float":
+                self.output.warning(
+                    f"{self.name}/{self.version} always instantiates the double precision kernels, "
+                    "user.precision:profile=float requires batmat 0.0.9 or later"
+                )
         self.options["guanaqo/*"].with_blas = True
+        if self.options.with_openmp:
+            # Use a single OpenMP runtime in the whole graph
+            self.options["guanaqo/*"].openmp_runtime = self.options.openmp_runtime
+        else:
+            self.options.rm_safe("openmp_runtime")
 
     def export_sources(self):
         commit = self.conan_data["commits"][self.version]
@@ -76,11 +94,45 @@ class BatmatRecipe(ConanFile):
         if self.options.get_safe("with_benchmarks"):
             self.requires("benchmark/1.9.4")
             self.requires("hyhound/1.1.0")
-        if self.options.get_safe("with_openmp") and self.settings.compiler == "clang":
-            self.requires(f"llvm-openmp/[~{self.settings.compiler.version}]")
+        if self._openmp_runtime == "libomp":
+            # libomp also implements the GOMP ABI used by GCC
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self))
         if self.options.get_safe("with_gsi_hpc_simd"):
             self.requires("gsi-hpc-simd/tttapa.20250625", transitive_headers=True)
 
+    @property
+    def _openmp_runtime(self):
+        runtime = self.options.get_safe("openmp_runtime")
+        if runtime is None:
+            return None
+        if runtime == "auto":
+            return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self)
+        return str(runtime)
+
+    def _validate_openmp_runtime(self):
+        runtime = self._openmp_runtime
+        if runtime == "libgomp" and self.settings.compiler != "gcc":
+            raise ConanInvalidConfiguration(f'"{self.name}/*:openmp_runtime=libgomp" option requires GCC')
+        if runtime == "libomp" and self.settings.compiler not in ["gcc", "clang", "apple-clang"]:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libomp" option requires GCC or Clang'
+            )
+        if self._openmp_runtime == "libgomp" and "llvm-openmp" in self.dependencies.host:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libgomp" conflicts with llvm-openmp in the dependency graph, '
+                f'use "{self.name}/*:openmp_runtime=libomp" to use a single OpenMP runtime'
+            )
+
+    def validate(self):
+        self._validate_openmp_runtime()
+
+    def package_id(self):
+        # Record the OpenMP runtime that was actually selected
+        if self.info.options.get_safe("openmp_runtime") == "auto":
+            utils = self.python_requires["tttapa-conan-utils"].module
+            default = utils.default_openmp_runtime.get(str(self.info.settings.compiler), "auto")
+            self.info.options.openmp_runtime = self.conf.get("user.openmp:runtime", default=default)
+
     def build_requirements(self):
         self.test_requires("eigen/[~5.0]")
         self.test_requires("gtest/1.17.0")
@@ -94,6 +146,7 @@ class BatmatRecipe(ConanFile):
             value = self.options.get_safe(k)
             if value is not None and value.value is not None:
                 tc.variables["BATMAT_" + k.upper()] = bool(value)
+        tc.variables["BATMAT_WITH_SINGLE"] = bool(self.options.with_single)
         guanaqo = self.dependencies["guanaqo"]
         index_type = guanaqo.options.get_safe("blas_index_type", default="int")
         tc.variables["BATMAT_DENSE_INDEX_TYPE"] = index_type
@@ -114,3 +167,6 @@ class BatmatRecipe(ConanFile):
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "none")
         self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "batmat"))
+        # Thread budget shared by all packages in the graph
+        if self.options.get_safe("with_openmp"):
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
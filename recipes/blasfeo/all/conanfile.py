@@ -1,8 +1,12 @@
+from glob import glob
+from io import StringIO
 import os
 
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
-from conan.tools.files import apply_conandata_patches, export_conandata_patches, get
+from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, load, save
+from conan.tools.scm import Git
 
 TARGET_LIST = [
     "X64_INTEL_SKYLAKE_X",
@@ -24,6 +28,120 @@ TARGET_LIST = [
     "GENERIC",
 ]
 
+# Maps Conan's settings.arch to a conservative BLASFEO TARGET
+conan_arch_to_blasfeo_target = {
+    "x86_64": "X64_INTEL_CORE",  # SSE3 only, supported by virtually all x86-64 CPUs
+    "armv8": "ARMV8A_ARM_CORTEX_A53",
+    "armv8.3": "ARMV8A_ARM_CORTEX_A53",
+}
+
+# Maps the -march/-mcpu flags to the corresponding BLASFEO TARGET, for each
+# value of settings.arch
+compiler_cpu_to_blasfeo_target = {
+    "x86_64": {
+        "x86-64-v2": "X64_INTEL_CORE",
+        "x86-64-v3": "X64_INTEL_HASWELL",
+        "x86-64-v4": "X64_INTEL_SKYLAKE_X",
+        "core2": "X64_INTEL_CORE",
+        "penryn": "X64_INTEL_CORE",
+        "nehalem": "X64_INTEL_CORE",
+        "westmere": "X64_INTEL_CORE",
+        "sandybridge": "X64_INTEL_SANDY_BRIDGE",
+        "ivybridge": "X64_INTEL_SANDY_BRIDGE",
+        "haswell": "X64_INTEL_HASWELL",
+        "broadwell": "X64_INTEL_HASWELL",
+        "skylake": "X64_INTEL_HASWELL",
+        "alderlake": "X64_INTEL_HASWELL",
+        "raptorlake": "X64_INTEL_HASWELL",
+        "meteorlake": "X64_INTEL_HASWELL",
+        "skylake-avx512": "X64_INTEL_SKYLAKE_X",
+        "cascadelake": "X64_INTEL_SKYLAKE_X",
+        "cooperlake": "X64_INTEL_SKYLAKE_X",
+        "icelake-client": "X64_INTEL_SKYLAKE_X",
+        "icelake-server": "X64_INTEL_SKYLAKE_X",
+        "tigerlake": "X64_INTEL_SKYLAKE_X",
+        "rocketlake": "X64_INTEL_SKYLAKE_X",
+        "sapphirerapids": "X64_INTEL_SKYLAKE_X",
+        "emeraldrapids": "X64_INTEL_SKYLAKE_X",
+        "graniterapids": "X64_INTEL_SKYLAKE_X",
+        # The X86_AMD_* targets are 32-bit only
+        "amdfam10": "X64_INTEL_CORE",
+        "barcelona": "X64_INTEL_CORE",
+        "btver1": "X64_INTEL_CORE",
+        "btver2": "X64_INTEL_SANDY_BRIDGE",  # AVX, no FMA3
+        "bdver1": "X64_INTEL_SANDY_BRIDGE",  # No FMA3
+        "bdver2": "X64_AMD_BULLDOZER",
+        "bdver3": "X64_AMD_BULLDOZER",
+        "bdver4": "X64_AMD_BULLDOZER",
+        "znver1": "X64_INTEL_HASWELL",
+        "znver2": "X64_INTEL_HASWELL",
+        "znver3": "X64_INTEL_HASWELL",
+        "znver4": "X64_INTEL_SKYLAKE_X",
+        "znver5": "X64_INTEL_SKYLAKE_X",
+    },
+    "armv8": {
+        "armv8-a": "ARMV8A_ARM_CORTEX_A53",
+        "armv8.1-a": "ARMV8A_ARM_CORTEX_A53",
+        "armv8.2-a": "ARMV8A_ARM_CORTEX_A55",
+        "armv8.3-a": "ARMV8A_ARM_CORTEX_A55",
+        "armv8.4-a": "ARMV8A_ARM_CORTEX_A55",
+        "armv8.5-a": "ARMV8A_ARM_CORTEX_A55",
+        "cortex-a53": "ARMV8A_ARM_CORTEX_A53",
+        "cortex-a55": "ARMV8A_ARM_CORTEX_A55",
+        "cortex-a57": "ARMV8A_ARM_CORTEX_A57",
+        "cortex-a72": "ARMV8A_ARM_CORTEX_A57",
+        "cortex-a73": "ARMV8A_ARM_CORTEX_A73",
+        "cortex-a75": "ARMV8A_ARM_CORTEX_A76",
+        "cortex-a76": "ARMV8A_ARM_CORTEX_A76",
+        "cortex-a77": "ARMV8A_ARM_CORTEX_A76",
+        "cortex-a78": "ARMV8A_ARM_CORTEX_A76",
+        "cortex-x1": "ARMV8A_ARM_CORTEX_A76",
+        "neoverse-n1": "ARMV8A_ARM_CORTEX_A76",
+        "apple-m1": "ARMV8A_APPLE_M1",
+        "apple-m2": "ARMV8A_APPLE_M1",
+        "apple-m3": "ARMV8A_APPLE_M1",
+        "apple-m4": "ARMV8A_APPLE_M1",
+    },
+    "armv7hf": {
+        "cortex-a7": "ARMV7A_ARM_CORTEX_A7",
+        "cortex-a9": "ARMV7A_ARM_CORTEX_A9",
+        "cortex-a15": "ARMV7A_ARM_CORTEX_A15",
+        "cortex-a17": "ARMV7A_ARM_CORTEX_A15",
+        "cortex-a53": "ARMV7A_ARM_CORTEX_A7",  # In-order, like the A7
+    },
+}
+compiler_cpu_to_blasfeo_target["armv8.3"] = compiler_cpu_to_blasfeo_target["armv8"]
+
+# Targets supported by the dispatch_targets option (x86_64 only, so no 32-bit
+# X86_* targets), ordered from most to least preferred, with the CPU features
+# they require (as in __builtin_cpu_supports)
+dispatch_cpu_features = {
+    "X64_INTEL_SKYLAKE_X": ["avx512f", "avx2", "fma"],
+    "X64_INTEL_HASWELL": ["avx2", "fma"],
+    "X64_AMD_BULLDOZER": ["avx", "fma", "fma4"],
+    "X64_INTEL_SANDY_BRIDGE": ["avx"],
+    "X64_INTEL_CORE": ["sse3"],
+    "GENERIC": [],
+}
+
+# Panel sizes (D_PS, S_PS) of the dispatch targets, see blasfeo_block_size.h
+blasfeo_panel_sizes = {
+    "X64_INTEL_SKYLAKE_X": (8, 16),
+    "X64_INTEL_HASWELL": (4, 8),
+    "X64_AMD_BULLDOZER": (4, 4),
+    "X64_INTEL_SANDY_BRIDGE": (4, 8),
+    "X64_INTEL_CORE": (4, 4),
+    "GENERIC": (4, 4),
+}
+
+# Maps the tttapa-toolchains target (arch.toolchain-cpu, os.toolchain-vendor)
+# to the corresponding BLASFEO TARGET
+toolchain_to_blasfeo_target = {
+    ("aarch64", "rpi3"): "ARMV8A_ARM_CORTEX_A53",
+    ("armv8", "rpi3"): "ARMV7A_ARM_CORTEX_A7",  # Cortex-A53 in AArch32 mode
+    ("armv7", "neon"): "ARMV7A_ARM_CORTEX_A9",  # NEON without VFPv4
+}
+
 
 class BlasfeoRecipe(ConanFile):
     name = "blasfeo"
@@ -35,15 +153,27 @@ class BlasfeoRecipe(ConanFile):
     description = "Basic linear algebra subroutines for embedded optimization."
     topics = "scientific software"
 
+    python_requires = "tttapa-conan-utils/1.0.0"
+
     # Binary configuration
     settings = "os", "compiler", "build_type", "arch"
     options = {
-        "target": TARGET_LIST,
+        "target": [None] + TARGET_LIST,
+        "la": ["HIGH_PERFORMANCE", "REFERENCE", "EXTERNAL_BLAS_WRAPPER"],
+        "mf": [None, "PANELMAJ", "COLMAJ"],
+        "blas_api": [True, False],
+        "fortran_blas_api": [True, False],
+        "dispatch_targets": [None, "ANY"],
         "shared": [True, False],
         "fPIC": [True, False],
     }
     default_options = {
-        "target": "GENERIC",
+        "target": None,
+        "la": "HIGH_PERFORMANCE",
+        "mf": None,
+        "blas_api": True,
+        "fortran_blas_api": False,
+        "dispatch_targets": None,
         "shared": False,
         "fPIC": True,
     }
@@ -55,44 +185,242 @@ class BlasfeoRecipe(ConanFile):
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if not self.options.target:
+            if self.options.dispatch_targets:
+                # The least demanding target provides the headers
+                self.options.target = self._dispatch_targets[-1]
+            else:
+                self.options.target = self._default_target
+        # The external BLAS wrapper only supports column-major matrices
+        if not self.options.mf:
+            self.options.mf = "COLMAJ" if self.options.la == "EXTERNAL_BLAS_WRAPPER" else "PANELMAJ"
+        if not self.options.blas_api:
+            self.options.rm_safe("fortran_blas_api")
+
+    @property
+    def _default_target(self):
+        # Try inferring the target from the compiler flags and toolchain settings
+        target = self._profile_blasfeo_target
+        if target:
+            self.output.info(f'Setting BLASFEO TARGET={target} based on the profile. Set the "{self.name}/*:target=XXX" option to override.')
+            return target
+        # Otherwise, use a conservative target for settings.arch
+        if self.settings.arch == "armv8" and self.settings.os in ["Macos", "iOS", "watchOS", "tvOS", "visionOS"]:
+            target = "ARMV8A_APPLE_M1"
+        else:
+            target = conan_arch_to_blasfeo_target.get(str(self.settings.arch))
+        if target:
+            self.output.warning(f'Setting BLASFEO TARGET={target} based on settings.arch. This may result in suboptimal performance. Set the "{self.name}/*:target=XXX" option or add -march/-mcpu to tools.build:cflags to silence this warning.')
+            return target
+        self.output.warning(f'Falling back to BLASFEO TARGET=GENERIC for arch={self.settings.arch}. This results in poor performance. Set the "{self.name}/*:target=XXX" option to silence this warning.')
+        return "GENERIC"
+
+    @property
+    def _profile_blasfeo_target(self):
+        # -mcpu is more specific than -march (and the only option on some ARM compilers)
+        cpu = None
+        for flags in ["tools.build:cflags", "tools.build:cxxflags"]:
+            for flag in self.conf.get(flags, default=[], check_type=list):
+                if flag.startswith("-march=") and not cpu:
+                    cpu = flag.split("=", 1)[1]
+                elif flag.startswith("-mcpu="):
+                    cpu = flag.split("=", 1)[1]
+            if cpu:
+                break
+        if cpu and cpu != "native":
+            # Ignore feature modifiers such as +crypto
+            base = cpu.split("+")[0]
+            cpus = compiler_cpu_to_blasfeo_target.get(str(self.settings.arch), {})
+            if base in cpus:
+                return cpus[base]
+            self.output.warning(f'Could not infer BLASFEO TARGET from unknown CPU "{cpu}" in the compiler flags')
+        toolchain_cpu = self.settings.get_safe("arch.toolchain-cpu")
+        toolchain_vendor = self.settings.get_safe("os.toolchain-vendor")
+        if toolchain_cpu or toolchain_vendor:
+            default_cpu = {"armv8": "aarch64", "armv7hf": "armv7", "armv6": "armv6"}
+            default_vendor = {"aarch64": "rpi3", "armv8": "rpi3", "armv7": "neon", "armv6": "rpi"}
+            toolchain_cpu = toolchain_cpu or default_cpu.get(str(self.settings.arch))
+            toolchain_vendor = toolchain_vendor or default_vendor.get(toolchain_cpu)
+            return toolchain_to_blasfeo_target.get((toolchain_cpu, toolchain_vendor))
+        return None
 
     def build_requirements(self):
         self.tool_requires("cmake/[>=3.24 <5]")
 
     def export_sources(self):
         export_conandata_patches(self)
+        copy(self, "dispatch/*", self.recipe_folder, self.export_sources_folder)
 
     def source(self):
-        get(
-            self,
-            **self.conan_data["sources"][self.version],
-            destination=self.source_folder,
-            strip_root=True
-        )
+        sources = self.conan_data["sources"][self.version]
+        if "commit" in sources:
+            git = Git(self)
+            git.clone(url=sources["url"], target=".")
+            git.checkout(sources["commit"])
+        else:
+            get(self, **sources, destination=self.source_folder, strip_root=True)
         apply_conandata_patches(self)
 
+    @property
+    def _cmake_config_dir(self):
+        # The releases are patched to install the config files to lib/cmake
+        # (0001-cmake-install-path.patch), newer versions use share/cmake
+        if "commit" in self.conan_data["sources"][self.version]:
+            return os.path.join("share", "cmake", "blasfeo")
+        return os.path.join("lib", "cmake", "blasfeo")
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
     def requirements(self):
-        pass
+        if self.options.la == "EXTERNAL_BLAS_WRAPPER":
+            self.requires("openblas/0.3.30", transitive_headers=True)
+
+    def validate(self):
+        if self.options.la == "EXTERNAL_BLAS_WRAPPER":
+            if self.options.mf != "COLMAJ":
+                raise ConanInvalidConfiguration(f'"{self.name}/*:la=EXTERNAL_BLAS_WRAPPER" option requires "{self.name}/*:mf=COLMAJ"')
+            # Both would define the standard BLAS symbols
+            if self.options.get_safe("fortran_blas_api"):
+                raise ConanInvalidConfiguration(f'"{self.name}/*:la=EXTERNAL_BLAS_WRAPPER" option is incompatible with "{self.name}/*:fortran_blas_api=True"')
+            openblas = self.dependencies["openblas"].options
+            if not openblas.build_lapack or openblas.interface64:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:la=EXTERNAL_BLAS_WRAPPER" option requires "openblas/*:build_lapack=True" and "openblas/*:interface64=False"')
+        if self.options.dispatch_targets:
+            targets = self._dispatch_targets
+            unsupported = [t for t in targets if t not in dispatch_cpu_features]
+            if unsupported:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:dispatch_targets" option contains unsupported targets {", ".join(unsupported)}. Supported targets: {", ".join(dispatch_cpu_features)}')
+            # The dispatcher uses GNU indirect functions and __builtin_cpu_supports
+            if self.settings.arch != "x86_64" or self.settings.os not in ["Linux", "FreeBSD"] or self.settings.compiler not in ["gcc", "clang"]:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:dispatch_targets" option is only supported for x86_64 Linux and FreeBSD with GCC or Clang')
+            if self.options.la != "HIGH_PERFORMANCE":
+                raise ConanInvalidConfiguration(f'"{self.name}/*:dispatch_targets" option requires "{self.name}/*:la=HIGH_PERFORMANCE"')
+            if str(self.options.target) not in targets:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:target" option should be one of the dispatch_targets')
+            # The panel size is used by the macros in the headers, so it cannot be dispatched
+            if self.options.mf == "PANELMAJ" and len({blasfeo_panel_sizes[t] for t in targets}) > 1:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:dispatch_targets" option contains targets with different panel sizes, which requires "{self.name}/*:mf=COLMAJ"')
+
+    @property
+    def _dispatch_targets(self):
+        targets = [t.strip() for t in str(self.options.dispatch_targets).split(",") if t.strip()]
+        priority = list(dispatch_cpu_features)
+        return sorted(set(targets), key=lambda t: priority.index(t) if t in priority else -1)
 
     def generate(self):
         deps = CMakeDeps(self)
         deps.generate()
         tc = CMakeToolchain(self)
         tc.variables["TARGET"] = self.options.target
+        tc.variables["LA"] = self.options.la
+        tc.variables["MF"] = self.options.mf
+        tc.variables["BLAS_API"] = self.options.blas_api
+        tc.variables["FORTRAN_BLAS_API"] = self.options.get_safe("fortran_blas_api", False)
+        if self.options.la == "EXTERNAL_BLAS_WRAPPER":
+            tc.variables["EXTERNAL_BLAS"] = "OPENBLAS"
+            # Link BLASFEO to the OpenBLAS from Conan rather than the one in /opt
+            openblas_cmake = os.path.join(self.generators_folder, "blasfeo-openblas.cmake")
+            save(self, openblas_cmake, self._openblas_cmake_dependency + "link_libraries($<BUILD_INTERFACE:OpenBLAS::OpenBLAS>)\n")
+            tc.cache_variables["CMAKE_PROJECT_INCLUDE"] = openblas_cmake.replace("\\", "/")
         tc.generate()
 
+    @property
+    def _openblas_cmake_dependency(self):
+        return "include(CMakeFindDependencyMacro)\nfind_dependency(OpenBLAS CONFIG)\n"
+
     def build(self):
+        if self.options.dispatch_targets:
+            self._build_dispatch()
+            return
         cmake = CMake(self)
         cmake.configure()
         cmake.build()
 
+    def _build_dispatch(self):
+        # Build a static library for each target, ending with the target that
+        # provides the headers (blasfeo_target.h is generated at configure time)
+        targets = sorted(self._dispatch_targets, key=lambda t: t == str(self.options.target))
+        utils = self.python_requires["tttapa-conan-utils"].module
+        libs, functions = [], None
+        for target in targets:
+            target_folder = os.path.join(self.build_folder, target)
+            utils.cmake_configure(self, target_folder, variables={"TARGET": target, "BUILD_SHARED_LIBS": False, "CMAKE_POSITION_INDEPENDENT_CODE": True})
+            utils.cmake_build(self, target_folder)
+            lib, target_functions = self._prefix_symbols(target)
+            libs.append(lib)
+            functions = target_functions if functions is None else functions & target_functions
+        # Dispatch the functions that are available for all targets
+        dispatch_source = os.path.join(self.build_folder, "blasfeo_dispatch.c")
+        save(self, dispatch_source, self._dispatch_source(sorted(functions)))
+        header_dirs = [os.path.join(self.source_folder, "include"), os.path.join(self.build_folder, str(self.options.target), "include")]
+        cmake = CMake(self)
+        cmake.configure(build_script_folder=os.path.join(self.export_sources_folder, "dispatch"), variables={
+            "BLASFEO_DISPATCH_SOURCE": dispatch_source.replace("\\", "/"),
+            "BLASFEO_DISPATCH_LIBS": ";".join(libs).replace("\\", "/"),
+            "BLASFEO_HEADER_DIRS": ";".join(header_dirs).replace("\\", "/"),
+            "BLASFEO_CONFIG_INSTALLATION_DIRECTORY": self._cmake_config_dir.replace("\\", "/"),
+        })
+        cmake.build()
+
+    def _prefix_symbols(self, target):
+        """Prefixes all symbols defined by the library of the given target and
+        returns the path of the resulting library and the unprefixed names of
+        the functions it defines."""
+        target_folder = os.path.join(self.build_folder, target)
+        lib = glob(os.path.join(target_folder, "**", "libblasfeo.a"), recursive=True)[0]
+        cmake_cache = load(self, os.path.join(target_folder, "CMakeCache.txt"))
+        nm, objcopy = [next(line.split("=", 1)[1] for line in cmake_cache.splitlines() if line.startswith(f"{var}:"))
+                       for var in ["CMAKE_NM", "CMAKE_OBJCOPY"]]
+        output = StringIO()
+        self.run(f'"{nm}" -g -P --defined-only "{lib}"', stdout=output)
+        symbols = {}
+        for line in output.getvalue().splitlines():
+            fields = line.split()
+            if len(fields) >= 2 and len(fields[1]) == 1:
+                symbols[fields[0]] = fields[1]
+        prefix = f"{target.lower()}_"
+        renames = os.path.join(target_folder, "prefix-symbols.txt")
+        save(self, renames, "".join(f"{sym} {prefix}{sym}\n" for sym in symbols))
+        prefixed_lib = os.path.join(self.build_folder, f"libblasfeo_{target.lower()}.a")
+        self.run(f'"{objcopy}" --redefine-syms="{renames}" "{lib}" "{prefixed_lib}"')
+        return prefixed_lib, {sym for sym, kind in symbols.items() if kind == "T"}
+
+    def _dispatch_source(self, functions):
+        targets = self._dispatch_targets
+        source = [
+            "/* Generated by the blasfeo Conan recipe */",
+            "",
+            "typedef void (*blasfeo_function)(void);",
+            "",
+            "static int blasfeo_dispatch_index(void) {",
+            "    __builtin_cpu_init();",
+        ]
+        for i, target in enumerate(targets[:-1]):
+            supported = " && ".join(f'__builtin_cpu_supports("{f}")' for f in dispatch_cpu_features[target]) or "1"
+            source.append(f"    if ({supported}) return {i}; /* {target} */")
+        source += [f"    return {len(targets) - 1}; /* {targets[-1]} */", "}", ""]
+        for function in functions:
+            # Hidden, so the resolvers do not need any relocations
+            source += [f"extern void {t.lower()}_{function}(void) __attribute__((visibility(\"hidden\")));" for t in targets]
+            source += [f"static blasfeo_function resolve_{function}(void) {{", "    switch (blasfeo_dispatch_index()) {"]
+            source += [f"        case {i}: return {t.lower()}_{function};" for i, t in enumerate(targets[:-1])]
+            source += [f"        default: return {targets[-1].lower()}_{function};", "    }", "}"]
+            source += [f'void {function}(void) __attribute__((ifunc("resolve_{function}")));', ""]
+        return "\n".join(source)
+
     def package(self):
         cmake = CMake(self)
         cmake.install()
+        if self.options.la == "EXTERNAL_BLAS_WRAPPER":
+            # The exported blasfeo target does not know about OpenBLAS
+            config = os.path.join(self.package_folder, self._cmake_config_dir, "blasfeoConfig.cmake")
+            save(self, config, "\n" + self._openblas_cmake_dependency + "set_property(TARGET blasfeo APPEND PROPERTY INTERFACE_LINK_LIBRARIES OpenBLAS::OpenBLAS)\n", append=True)
 
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "none")
-        self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "blasfeo"))
+        # For non-CMake consumers (e.g. Autotools or pkg-config)
+        self.cpp_info.libs = ["blasfeo"]
+        if self.settings.os in ["Linux", "FreeBSD"]:
+            self.cpp_info.system_libs = ["m"]
+        self.cpp_info.builddirs.append(self._cmake_config_dir)
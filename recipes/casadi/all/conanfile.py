@@ -1,6 +1,7 @@
 import os
 
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
 from conan.tools.files import apply_conandata_patches, export_conandata_patches, get
 
@@ -21,6 +22,8 @@ class CasADiRecipe(ConanFile):
         "be used from C++, Python or Matlab/Octave."
     )
 
+    python_requires = "tttapa-conan-utils/1.0.0"
+
     # Binary configuration
     settings = "os", "compiler", "build_type", "arch"
     casadi_cmake_options = {
@@ -218,6 +221,30 @@ class CasADiRecipe(ConanFile):
         if self.options.shared:
             self.options.rm_safe("fPIC")
 
+    @property
+    def _openmp_runtime(self):
+        if not self.options.with_openmp:
+            return None
+        return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self)
+
+    def requirements(self):
+        if self._openmp_runtime == "libomp":
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self))
+
+    def validate(self):
+        if self._openmp_runtime == "libgomp" and self.settings.compiler != "gcc":
+            raise ConanInvalidConfiguration(f'"{self.name}/*:with_openmp=True" with user.openmp:runtime=libgomp requires GCC')
+        if self._openmp_runtime == "libgomp" and "llvm-openmp" in self.dependencies.host:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:with_openmp=True" with user.openmp:runtime=libgomp conflicts with llvm-openmp in the dependency graph, '
+                'use user.openmp:runtime=libomp to use a single OpenMP runtime'
+            )
+
+    def package_id(self):
+        # Record the OpenMP runtime that was selected
+        if self.info.options.with_openmp and self.conf.get("user.openmp:runtime"):
+            self.info.conf.define("user.openmp:runtime", self.conf.get("user.openmp:runtime"))
+
     def export_sources(self):
         export_conandata_patches(self)
 
@@ -258,3 +285,6 @@ class CasADiRecipe(ConanFile):
             self.cpp_info.builddirs.append(os.path.join("casadi", "cmake"))
         else:
             self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "casadi"))
+        # Thread budget shared by all packages in the graph
+        if self.options.with_openmp:
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
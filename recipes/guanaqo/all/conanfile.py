@@ -1,6 +1,7 @@
 import os
 
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.build import can_run
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
 from conan.tools.files import apply_conandata_patches, export_conandata_patches, get, save
@@ -18,6 +19,8 @@ class guanaqoRecipe(ConanFile):
     description = "Utilities for scientific software."
     topics = "scientific software"
 
+    python_requires = "tttapa-conan-utils/1.0.0"
+
     # Binary configuration
     settings = "os", "compiler", "build_type", "arch"
     # https://github.com/conan-io/conan/issues/19108
@@ -37,12 +40,14 @@ class guanaqoRecipe(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
-        "blas_index_type": ["int", "long", "long long"],  # affects ABI
+        "blas_index_type": [None, "int", "long", "long long"],  # affects ABI
+        "openmp_runtime": ["auto", "libgomp", "libomp"],  # affects ABI
     } | {k: [True, False] for k in bool_guanaqo_options}
     default_options = {
         "shared": False,
         "fPIC": True,
-        "blas_index_type": "long long",
+        "blas_index_type": None,
+        "openmp_runtime": "auto",
     } | bool_guanaqo_options
 
     def config_options(self):
@@ -57,6 +62,7 @@ class guanaqoRecipe(ConanFile):
             self.options.rm_safe("blas_index_type")
         if Version(self.version) < "1.0.0-alpha.10":
             self.options.rm_safe("with_openmp")
+            self.options.rm_safe("openmp_runtime")
         if Version(self.version) < "1.0.0-alpha.13":
             self.options.rm_safe("with_hl_blas_tracing")
         if Version(self.version) < "1.0.0-alpha.24":
@@ -69,9 +75,14 @@ class guanaqoRecipe(ConanFile):
             self.options.rm_safe("fPIC")
         with_blas = self.options.get_safe("with_blas")
         if with_blas:
-            if not self.options.with_mkl:
-                # OpenBLAS does not allow configuring the index type
-                self.options.rm_safe("blas_index_type")
+            if not self.options.blas_index_type:
+                self.options.blas_index_type = "long long" if self.options.with_mkl else "int"
+            # OpenBLAS and MKL support either 32-bit (LP64) or 64-bit (ILP64) indices
+            ilp64 = self.options.blas_index_type != "int"
+            if self.options.with_mkl:
+                self.options["intel-mkl/*"].interface = "ilp64" if ilp64 else "lp64"
+            else:
+                self.options["openblas/*"].interface64 = ilp64
         else:
             self.options.rm_safe("with_mkl")
             self.options.rm_safe("blas_index_type")
@@ -79,6 +90,8 @@ class guanaqoRecipe(ConanFile):
             self.options.rm_safe("with_hl_blas_tracing")
         if not self.options.get_safe("with_perfetto") or not self.options.get_safe("with_pcm"):
             self.options.rm_safe("with_pcm_tracing")
+        if not self.options.get_safe("with_openmp"):
+            self.options.rm_safe("openmp_runtime")
 
     def export_sources(self):
         commit = self.conan_data["commits"][self.version]
@@ -104,13 +117,70 @@ class guanaqoRecipe(ConanFile):
             self.requires("perfetto/52.0", transitive_headers=True)
         if self.options.get_safe("with_pcm"):
             self.requires("intel-pcm/tttapa.20260207")
-        if self.options.get_safe("with_blas") and not self.options.get_safe("with_mkl"):
-            self.requires("openblas/0.3.30", transitive_headers=True)
-        if self.options.get_safe("with_openmp") and self.settings.compiler == "clang":
-            self.requires(
-                f"llvm-openmp/[~{self.settings.compiler.version}]",
-                transitive_headers=True,
+        if self.options.get_safe("with_blas"):
+            if self.options.with_mkl:
+                self.requires("intel-mkl/2025.2.0", transitive_headers=True)
+            else:
+                self.requires("openblas/0.3.30", transitive_headers=True)
+        if self._openmp_runtime == "libomp":
+            # libomp also implements the GOMP ABI used by GCC
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self), transitive_headers=True)
+
+    @property
+    def _openmp_runtime(self):
+        runtime = self.options.get_safe("openmp_runtime")
+        if runtime is None:
+            return None
+        if runtime == "auto":
+            return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self)
+        return str(runtime)
+
+    @property
+    def _openblas_index_type(self):
+        # OpenBLAS uses BLASLONG (long, or long long on Windows) for ILP64
+        return "long long" if self.settings.os == "Windows" else "long"
+
+    def validate(self):
+        runtime = self._openmp_runtime
+        if runtime == "libgomp" and self.settings.compiler != "gcc":
+            raise ConanInvalidConfiguration(f'"{self.name}/*:openmp_runtime=libgomp" option requires GCC')
+        if runtime == "libomp" and self.settings.compiler not in ["gcc", "clang", "apple-clang"]:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libomp" option requires GCC or Clang'
+            )
+        if self._openmp_runtime == "libgomp" and "llvm-openmp" in self.dependencies.host:
+            raise ConanInvalidConfiguration(
+                f'"{self.name}/*:openmp_runtime=libgomp" conflicts with llvm-openmp in the dependency graph, '
+                f'use "{self.name}/*:openmp_runtime=libomp" to use a single OpenMP runtime'
             )
+        index_type = self.options.get_safe("blas_index_type")
+        if index_type is not None and not self.options.with_mkl:
+            interface64 = self.dependencies["openblas"].options.get_safe("interface64", default=False)
+            if index_type == "int" and interface64:
+                msg = 'OpenBLAS was built with "openblas/*:interface64=True", '
+                msg += f'which requires "{self.name}/*:blas_index_type={self._openblas_index_type}"'
+                raise ConanInvalidConfiguration(msg)
+            if index_type != "int" and (not interface64 or index_type != self._openblas_index_type):
+                msg = f'"{self.name}/*:blas_index_type={index_type}" is not supported by OpenBLAS. '
+                msg += f'Use "int", or "{self._openblas_index_type}" with "openblas/*:interface64=True".'
+                raise ConanInvalidConfiguration(msg)
+        if index_type is not None and self.options.with_mkl:
+            interface = self.dependencies["intel-mkl"].options.interface
+            if interface != ("lp64" if index_type == "int" else "ilp64"):
+                msg = f'"{self.name}/*:blas_index_type={index_type}" is incompatible with "intel-mkl/*:interface={interface}"'
+                raise ConanInvalidConfiguration(msg)
+            if index_type == "long" and self.settings.os == "Windows":
+                # MKL_INT is a 64-bit long long in the ILP64 interface
+                msg = f'"{self.name}/*:blas_index_type=long" is not supported by MKL on Windows. '
+                msg += 'Use "int" or "long long".'
+                raise ConanInvalidConfiguration(msg)
+
+    def package_id(self):
+        # Record the runtime that was actually selected
+        if self.info.options.get_safe("openmp_runtime") == "auto":
+            utils = self.python_requires["tttapa-conan-utils"].module
+            default = utils.default_openmp_runtime.get(str(self.info.settings.compiler), "auto")
+            self.info.options.openmp_runtime = self.conf.get("user.openmp:runtime", default=default)
 
     def build_requirements(self):
         self.tool_requires("cmake/[>=3.24 <5]")
@@ -151,3 +221,6 @@ class guanaqoRecipe(ConanFile):
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "none")
         self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "guanaqo"))
+        # Thread budget shared by all packages in the graph
+        if self.options.get_safe("with_openmp"):
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
@@ -16,8 +16,14 @@ class guanaqoTestConan(ConanFile):
         self.tool_requires("cmake/[>=3.24 <5]")
 
     def build(self):
+        guanaqo = self.dependencies[self.tested_reference_str]
+        with_blas = bool(guanaqo.options.get_safe("with_blas"))
+        variables = {
+            "GUANAQO_TEST_OPENMP_BLAS": with_blas and bool(guanaqo.options.get_safe("with_openmp")),
+            "GUANAQO_TEST_MKL": with_blas and bool(guanaqo.options.with_mkl),
+        }
         cmake = CMake(self)
-        cmake.configure()
+        cmake.configure(variables=variables)
         cmake.build()
 
     def layout(self):
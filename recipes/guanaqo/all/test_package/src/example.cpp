@@ -2,9 +2,76 @@
 #include <guanaqo/demangled-typename.hpp>
 #include <iostream>
 
+#if GUANAQO_TEST_OPENMP_BLAS
+#if GUANAQO_TEST_MKL
+#include <mkl_cblas.h>
+#else
+#include <cblas.h>
+#endif
+#include <vector>
+
+// Calls BLAS from within an OpenMP parallel region, so that both guanaqo's
+// and the BLAS library's OpenMP runtimes (if any) are loaded.
+double parallel_dot() {
+    const int n = 64;
+    std::vector<double> x(n, 1), y(n, 2);
+    double sum = 0;
+#pragma omp parallel for reduction(+ : sum)
+    for (int i = 0; i < 4; ++i)
+        sum += cblas_ddot(n, x.data(), 1, y.data(), 1);
+    return sum;
+}
+
+#if defined(__linux__)
+#include <link.h>
+#include <climits>
+#include <cstdlib>
+#include <set>
+#include <string>
+
+// Returns the paths of all OpenMP runtimes loaded in this process. Multiple
+// runtimes each start their own thread pool, oversubscribing the CPU.
+std::set<std::string> loaded_openmp_runtimes() {
+    std::set<std::string> runtimes;
+    dl_iterate_phdr(
+        [](dl_phdr_info *info, size_t, void *data) {
+            std::string path = info->dlpi_name ? info->dlpi_name : "";
+            auto name = path.substr(path.find_last_of('/') + 1);
+            for (const char *runtime : {"libgomp", "libomp", "libiomp5"}) {
+                if (name.rfind(runtime, 0) == 0) {
+                    // Resolve symlinks such as libgomp.so -> libomp.so
+                    char resolved[PATH_MAX];
+                    if (realpath(path.c_str(), resolved))
+                        path = resolved;
+                    static_cast<std::set<std::string> *>(data)->insert(path);
+                }
+            }
+            return 0;
+        },
+        &runtimes);
+    return runtimes;
+}
+#endif
+#endif
+
 int main() {
     std::cout << "guanaqo " << GUANAQO_VERSION << " (" << guanaqo_commit_hash << ")" << std::endl;
     struct {
     } s;
     std::cout << guanaqo::demangled_typename(typeid(s)) << std::endl;
+#if GUANAQO_TEST_OPENMP_BLAS
+    if (parallel_dot() != 4 * 128) {
+        std::cerr << "Error: unexpected result of cblas_ddot\n";
+        return 1;
+    }
+#if defined(__linux__)
+    auto runtimes = loaded_openmp_runtimes();
+    for (const auto &runtime : runtimes)
+        std::cout << "OpenMP runtime: " << runtime << "\n";
+    if (runtimes.size() > 1) {
+        std::cerr << "Error: multiple OpenMP runtimes were loaded\n";
+        return 1;
+    }
+#endif
+#endif
 }
@@ -1,10 +1,23 @@
 import os
 
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
 from conan.tools.files import apply_conandata_patches, export_conandata_patches
 from conan.tools.scm.git import Git
 
+# Maps the BLASFEO TARGET to the matching HPIPM TARGET
+blasfeo_to_hpipm_target = {
+    "X64_INTEL_SKYLAKE_X": "AVX512",
+    "X64_INTEL_HASWELL": "AVX",
+    "X64_INTEL_SANDY_BRIDGE": "AVX",
+    "X64_AMD_BULLDOZER": "AVX",
+    "X86_AMD_JAGUAR": "AVX",
+}
+
+# HPIPM TARGETs, ordered by the instruction set extensions they require
+hpipm_targets = ["GENERIC", "AVX", "AVX512"]
+
 
 class HpipmRecipe(ConanFile):
     name = "hpipm"
@@ -21,10 +34,12 @@ class HpipmRecipe(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "target": [None] + hpipm_targets,
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "target": None,
     }
 
     def config_options(self):
@@ -50,6 +65,31 @@ class HpipmRecipe(ConanFile):
     def requirements(self):
         self.requires("blasfeo/tttapa.20260119", transitive_headers=True)
 
+    def validate(self):
+        target = self._target
+        blasfeo_target = str(self.dependencies["blasfeo"].options.target)
+        expected = self._blasfeo_hpipm_target
+        # HPIPM may use a subset of the instructions used by BLASFEO, but
+        # GENERIC HPIPM code with a vectorized BLASFEO is a mismatch as well
+        if hpipm_targets.index(target) > hpipm_targets.index(expected) or (target == "GENERIC") != (expected == "GENERIC"):
+            raise ConanInvalidConfiguration(f'"{self.name}/*:target={target}" option does not match "blasfeo/*:target={blasfeo_target}" (expected {expected})')
+
+    def package_id(self):
+        # The effective TARGET depends on the BLASFEO target, which is not
+        # part of the package ID of a static dependency
+        if not self.info.options.target:
+            self.info.options.target = self._blasfeo_hpipm_target
+
+    @property
+    def _blasfeo_hpipm_target(self):
+        return blasfeo_to_hpipm_target.get(str(self.dependencies["blasfeo"].options.target), "GENERIC")
+
+    @property
+    def _target(self):
+        if self.options.target:
+            return str(self.options.target)
+        return self._blasfeo_hpipm_target
+
     def build_requirements(self):
         self.tool_requires("cmake/[>=3.24 <5]")
 
@@ -58,8 +98,7 @@ class HpipmRecipe(ConanFile):
         deps.generate()
         tc = CMakeToolchain(self)
         tc.variables["HPIPM_FIND_BLASFEO"] = True
-        if self.settings.arch not in ["x86", "x86_64"]:
-            tc.cache_variables["TARGET"] = "GENERIC"
+        tc.cache_variables["TARGET"] = self._target
         tc.generate()
 
     def build(self):
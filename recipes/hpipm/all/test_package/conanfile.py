@@ -1,8 +1,10 @@
 import os
+import shlex
 
 from conan import ConanFile
 from conan.tools.cmake import CMake, cmake_layout
 from conan.tools.build import can_run
+from conan.tools.files import mkdir
 
 
 class HpipmTestConan(ConanFile):
@@ -15,7 +17,7 @@ class HpipmTestConan(ConanFile):
     def build(self):
         version = self.dependencies[self.tested_reference_str].ref.version
         cmake = CMake(self)
-        cmake.configure(variables={"HPIPM_VERSION": version})
+        cmake.configure(variables={"HPIPM_VERSION": version, "HPIPM_BENCHMARK": self._benchmark})
         cmake.build()
 
     def layout(self):
@@ -25,3 +27,39 @@ class HpipmTestConan(ConanFile):
         if can_run(self):
             cmd = os.path.join(self.cpp.build.bindir, "example")
             self.run(cmd, env="conanrun")
+            if self._benchmark:
+                self._run_benchmark()
+
+    @property
+    def _benchmark(self):
+        return self.conf.get("user.hpipm:benchmark", default=False, check_type=bool)
+
+    @property
+    def _benchmark_output_dir(self):
+        output_dir = self.conf.get("user.hpipm:benchmark_output_dir", check_type=str)
+        if not output_dir:
+            self.output.warning("Writing the HPIPM benchmark results to the test_package build folder, which is "
+                                "removed by the next conan test or create. Set user.hpipm:benchmark_output_dir to keep them.")
+            return self.build_folder
+        output_dir = os.path.abspath(output_dir)
+        mkdir(self, output_dir)
+        return output_dir
+
+    def _run_benchmark(self):
+        hpipm = self.dependencies[self.tested_reference_str]
+        output_dir = self._benchmark_output_dir
+        blasfeo = self.dependencies["blasfeo"]
+        # Problems as "N,nx,nu,box,ng": horizon, states, inputs, box constraints (0/1), general constraints
+        problems = self.conf.get("user.hpipm:benchmark_problems", default=["20,8,3,1,0", "50,12,4,1,4"], check_type=list)
+        reps = self.conf.get("user.hpipm:benchmark_reps", default=100, check_type=int)
+        for problem in problems:
+            N, nx, nu, box, ng = (int(n) for n in str(problem).split(","))
+            output = os.path.join(output_dir, f"hpipm-benchmark-N{N}-nx{nx}-nu{nu}-box{box}-ng{ng}.json")
+            args = [
+                os.path.join(self.cpp.build.bindir, "benchmark"),
+                output, N, nx, nu, box, ng, reps,
+                hpipm.info.options.target,  # Resolved from the BLASFEO target in package_id()
+                blasfeo.options.target,
+            ]
+            self.run(" ".join(shlex.quote(str(a)) for a in args), env="conanrun")
+            self.output.info(f"HPIPM benchmark results: {output}")
@@ -0,0 +1,304 @@
+/*
+ * Benchmark of the HPIPM OCP QP interior point solver.
+ *
+ * Usage: benchmark <output.json> <N> <nx> <nu> <box> <ng> <reps> [hpipm_target] [blasfeo_target]
+ *
+ * Builds a random, feasible OCP QP with horizon N, nx states and nu inputs,
+ * fixed initial state, optional box constraints on all states and inputs, and
+ * ng general constraints per stage. For both speed and robust mode, the JSON
+ * output contains:
+ *   - status, iter, time: reps cold-started solves of the nominal problem,
+ *   - iterations: the residuals of each interior point iteration of the cold
+ *     solve, and its cost, measured as the difference between the best times
+ *     with iter_max = k and iter_max = k - 1,
+ *   - warm: reps warm-started solves, perturbing the initial state between
+ *     solves like in MPC.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#include <hpipm_common.h>
+#include <hpipm_d_ocp_qp.h>
+#include <hpipm_d_ocp_qp_dim.h>
+#include <hpipm_d_ocp_qp_ipm.h>
+#include <hpipm_d_ocp_qp_sol.h>
+#include <hpipm_timing.h>
+
+static unsigned long long rng_state = 12345;
+
+static double rand_uniform(double lo, double hi) {
+    rng_state = rng_state * 6364136223846793005ULL + 1442695040888963407ULL;
+    return lo + (hi - lo) * (double)(rng_state >> 11) / 9007199254740992.0;
+}
+
+static double *rand_mat(int m, int n, double scale) {
+    double *M = malloc((size_t)(m * n > 0 ? m * n : 1) * sizeof(double));
+    for (int i = 0; i < m * n; ++i)
+        M[i] = rand_uniform(-scale, scale);
+    return M;
+}
+
+static double *const_vec(int n, double value) {
+    double *v = malloc((size_t)(n > 0 ? n : 1) * sizeof(double));
+    for (int i = 0; i < n; ++i)
+        v[i] = value;
+    return v;
+}
+
+static int *range(int n) {
+    int *v = malloc((size_t)(n > 0 ? n : 1) * sizeof(int));
+    for (int i = 0; i < n; ++i)
+        v[i] = i;
+    return v;
+}
+
+static int compare_double(const void *a, const void *b) {
+    double x = *(const double *)a, y = *(const double *)b;
+    return (x > y) - (x < y);
+}
+
+struct problem {
+    int N, nx, nu, box, ng;
+    struct d_ocp_qp_dim dim;
+    struct d_ocp_qp qp;
+    struct d_ocp_qp_sol sol;
+    double *x0;
+    void *dim_mem, *qp_mem, *sol_mem;
+};
+
+static void set_initial_state(struct problem *p, const double *x0) {
+    d_ocp_qp_set_lbx(0, (double *)x0, &p->qp);
+    d_ocp_qp_set_ubx(0, (double *)x0, &p->qp);
+}
+
+static void create_problem(struct problem *p) {
+    int N = p->N, nx = p->nx, nu = p->nu;
+    p->dim_mem = malloc(d_ocp_qp_dim_memsize(N));
+    d_ocp_qp_dim_create(N, &p->dim, p->dim_mem);
+    for (int k = 0; k <= N; ++k) {
+        d_ocp_qp_dim_set_nx(k, nx, &p->dim);
+        d_ocp_qp_dim_set_nu(k, k < N ? nu : 0, &p->dim);
+        // The initial state is fixed using equal upper and lower bounds
+        d_ocp_qp_dim_set_nbx(k, k == 0 || p->box ? nx : 0, &p->dim);
+        d_ocp_qp_dim_set_nbu(k, k < N && p->box ? nu : 0, &p->dim);
+        d_ocp_qp_dim_set_ng(k, k < N ? p->ng : 0, &p->dim);
+    }
+
+    p->qp_mem = malloc(d_ocp_qp_memsize(&p->dim));
+    d_ocp_qp_create(&p->dim, &p->qp, p->qp_mem);
+    // Stable random dynamics, identity weights
+    double *A = rand_mat(nx, nx, 0.05), *B = rand_mat(nx, nu, 0.5);
+    for (int i = 0; i < nx; ++i)
+        A[i + i * nx] += 0.9;
+    double *b = const_vec(nx, 0), *Q = const_vec(nx * nx, 0), *R = const_vec(nu * nu, 0);
+    double *S = const_vec(nu * nx, 0), *q = const_vec(nx, 0.1), *r = const_vec(nu, 0);
+    for (int i = 0; i < nx; ++i)
+        Q[i + i * nx] = 1;
+    for (int i = 0; i < nu; ++i)
+        R[i + i * nu] = 1;
+    double *C = rand_mat(p->ng, nx, 0.1), *D = rand_mat(p->ng, nu, 0.1);
+    double *lg = const_vec(p->ng, -5), *ug = const_vec(p->ng, 5);
+    double *lbx = const_vec(nx, -5), *ubx = const_vec(nx, 5);
+    double *lbu = const_vec(nu, -1), *ubu = const_vec(nu, 1);
+    int *idxbx = range(nx), *idxbu = range(nu);
+    p->x0 = rand_mat(nx, 1, 0.5);
+    for (int k = 0; k <= N; ++k) {
+        d_ocp_qp_set_Q(k, Q, &p->qp);
+        d_ocp_qp_set_q(k, q, &p->qp);
+        if (k < N) {
+            d_ocp_qp_set_A(k, A, &p->qp);
+            d_ocp_qp_set_B(k, B, &p->qp);
+            d_ocp_qp_set_b(k, b, &p->qp);
+            d_ocp_qp_set_R(k, R, &p->qp);
+            d_ocp_qp_set_S(k, S, &p->qp);
+            d_ocp_qp_set_r(k, r, &p->qp);
+        }
+        if (k == 0 || p->box) {
+            d_ocp_qp_set_idxbx(k, idxbx, &p->qp);
+            d_ocp_qp_set_lbx(k, lbx, &p->qp);
+            d_ocp_qp_set_ubx(k, ubx, &p->qp);
+        }
+        if (k < N && p->box) {
+            d_ocp_qp_set_idxbu(k, idxbu, &p->qp);
+            d_ocp_qp_set_lbu(k, lbu, &p->qp);
+            d_ocp_qp_set_ubu(k, ubu, &p->qp);
+        }
+        if (k < N && p->ng > 0) {
+            d_ocp_qp_set_C(k, C, &p->qp);
+            d_ocp_qp_set_D(k, D, &p->qp);
+            d_ocp_qp_set_lg(k, lg, &p->qp);
+            d_ocp_qp_set_ug(k, ug, &p->qp);
+        }
+    }
+    set_initial_state(p, p->x0);
+    free(A), free(B), free(b), free(Q), free(R), free(S), free(q), free(r);
+    free(C), free(D), free(lg), free(ug), free(lbx), free(ubx), free(lbu), free(ubu);
+    free(idxbx), free(idxbu);
+
+    p->sol_mem = malloc(d_ocp_qp_sol_memsize(&p->dim));
+    d_ocp_qp_sol_create(&p->dim, &p->sol, p->sol_mem);
+}
+
+static void free_problem(struct problem *p) {
+    free(p->x0), free(p->dim_mem), free(p->qp_mem), free(p->sol_mem);
+}
+
+static void write_array(FILE *f, const char *name, const double *v, int n) {
+    fprintf(f, "\"%s\": [", name);
+    for (int i = 0; i < n; ++i)
+        fprintf(f, "%s%.9e", i ? ", " : "", v[i]);
+    fprintf(f, "]");
+}
+
+static void write_int_array(FILE *f, const char *name, const int *v, int n) {
+    fprintf(f, "\"%s\": [", name);
+    for (int i = 0; i < n; ++i)
+        fprintf(f, "%s%d", i ? ", " : "", v[i]);
+    fprintf(f, "]");
+}
+
+static void write_summary(FILE *f, const char *name, const double *t, int n) {
+    double *sorted = malloc((size_t)n * sizeof(double)), sum = 0;
+    for (int i = 0; i < n; ++i)
+        sorted[i] = t[i], sum += t[i];
+    qsort(sorted, (size_t)n, sizeof(double), compare_double);
+    fprintf(f, "\"%s\": {\"min\": %.9e, \"median\": %.9e, \"mean\": %.9e, \"max\": %.9e}", name,
+            sorted[0], sorted[n / 2], sum / n, sorted[n - 1]);
+    free(sorted);
+}
+
+static void benchmark_mode(FILE *f, struct problem *p, enum hpipm_mode mode, int reps) {
+    hpipm_timer timer;
+    struct d_ocp_qp_ipm_arg arg;
+    void *arg_mem = malloc(d_ocp_qp_ipm_arg_memsize(&p->dim));
+    d_ocp_qp_ipm_arg_create(&p->dim, &arg, arg_mem);
+    d_ocp_qp_ipm_arg_set_default(mode, &arg);
+    struct d_ocp_qp_ipm_ws ws;
+    void *ws_mem = malloc(d_ocp_qp_ipm_ws_memsize(&p->dim, &arg));
+    d_ocp_qp_ipm_ws_create(&p->dim, &arg, &ws, ws_mem);
+    double *times = malloc((size_t)reps * sizeof(double));
+    int *iters = malloc((size_t)reps * sizeof(int));
+    int status, iter, warm_start = 0;
+
+    // Cold-started solves of the nominal problem
+    set_initial_state(p, p->x0);
+    d_ocp_qp_ipm_arg_set_warm_start(&warm_start, &arg);
+    for (int i = 0; i < reps; ++i) {
+        hpipm_tic(&timer);
+        d_ocp_qp_ipm_solve(&p->qp, &p->sol, &arg, &ws);
+        times[i] = hpipm_toc(&timer);
+    }
+    d_ocp_qp_ipm_get_status(&ws, &status);
+    d_ocp_qp_ipm_get_iter(&ws, &iter);
+    double *ws_stat;
+    int stat_m;
+    d_ocp_qp_ipm_get_stat(&ws, &ws_stat);
+    d_ocp_qp_ipm_get_stat_m(&ws, &stat_m);
+    // Copy the statistics, the workspace is reused below
+    double *stat = malloc((size_t)((iter + 1) * stat_m) * sizeof(double));
+    for (int i = 0; i < (iter + 1) * stat_m; ++i)
+        stat[i] = ws_stat[i];
+    fprintf(f, "{\"status\": %d, \"iter\": %d, ", status, iter);
+    write_summary(f, "time", times, reps);
+    fprintf(f, ",\n      \"iterations\": [");
+    // alpha_aff, mu_aff, sigma, alpha_prim, alpha_dual, mu, res_stat, res_eq, res_ineq, res_comp
+    for (int k = 0; k <= iter; ++k) {
+        const double *s = stat + k * stat_m;
+        fprintf(f, "%s\n        {\"alpha_prim\": %.9e, \"alpha_dual\": %.9e, \"mu\": %.9e, "
+                   "\"res_stat\": %.9e, \"res_eq\": %.9e, \"res_ineq\": %.9e, \"res_comp\": %.9e",
+                k ? "," : "", s[3], s[4], s[5], s[6], s[7], s[8], s[9]);
+        if (k > 0) {
+            // Cost of iteration k: best time with iter_max = k minus iter_max = k - 1
+            double best[2];
+            for (int j = 0; j < 2; ++j) {
+                int k_max = k - j;
+                d_ocp_qp_ipm_arg_set_iter_max(&k_max, &arg);
+                best[j] = 1e300;
+                for (int i = 0; i < reps; ++i) {
+                    hpipm_tic(&timer);
+                    d_ocp_qp_ipm_solve(&p->qp, &p->sol, &arg, &ws);
+                    double t = hpipm_toc(&timer);
+                    best[j] = t < best[j] ? t : best[j];
+                }
+            }
+            fprintf(f, ", \"time\": %.9e", best[0] - best[1]);
+        }
+        fprintf(f, "}");
+    }
+    fprintf(f, "],\n      \"warm\": {");
+
+    // Warm-started solves, with a slightly different initial state each time
+    d_ocp_qp_ipm_arg_set_default(mode, &arg); // restores iter_max
+    d_ocp_qp_ipm_solve(&p->qp, &p->sol, &arg, &ws);
+    warm_start = 1;
+    d_ocp_qp_ipm_arg_set_warm_start(&warm_start, &arg);
+    double *x0 = malloc((size_t)p->nx * sizeof(double));
+    int cold_status = status, cold_iter = iter, failures = 0;
+    for (int i = 0; i < reps; ++i) {
+        for (int j = 0; j < p->nx; ++j)
+            x0[j] = p->x0[j] + rand_uniform(-0.01, 0.01);
+        set_initial_state(p, x0);
+        hpipm_tic(&timer);
+        d_ocp_qp_ipm_solve(&p->qp, &p->sol, &arg, &ws);
+        times[i] = hpipm_toc(&timer);
+        d_ocp_qp_ipm_get_status(&ws, &status);
+        d_ocp_qp_ipm_get_iter(&ws, &iters[i]);
+        failures += status != 0;
+    }
+    fprintf(f, "\"failures\": %d, ", failures);
+    write_summary(f, "time", times, reps);
+    fprintf(f, ",\n        ");
+    write_array(f, "times", times, reps);
+    fprintf(f, ",\n        ");
+    write_int_array(f, "iters", iters, reps);
+    fprintf(f, "}}");
+    printf("  cold: status %d, %d iterations; warm: %d failures\n", cold_status, cold_iter,
+           failures);
+
+    free(x0), free(stat), free(times), free(iters), free(arg_mem), free(ws_mem);
+}
+
+int main(int argc, char *argv[]) {
+    if (argc < 8) {
+        fprintf(stderr,
+                "Usage: %s <output.json> <N> <nx> <nu> <box> <ng> <reps> [hpipm_target] "
+                "[blasfeo_target]\n",
+                argv[0]);
+        return 1;
+    }
+    struct problem p = {0};
+    p.N = atoi(argv[2]), p.nx = atoi(argv[3]), p.nu = atoi(argv[4]);
+    p.box = atoi(argv[5]), p.ng = atoi(argv[6]);
+    int reps = atoi(argv[7]);
+    if (p.N < 1 || p.nx < 1 || p.nu < 0 || p.ng < 0 || reps < 1) {
+        fprintf(stderr, "Invalid problem dimensions\n");
+        return 1;
+    }
+    const char *hpipm_target = argc > 8 ? argv[8] : "unknown";
+    const char *blasfeo_target = argc > 9 ? argv[9] : "unknown";
+    create_problem(&p);
+
+    FILE *f = fopen(argv[1], "w");
+    if (!f) {
+        fprintf(stderr, "Failed to open %s\n", argv[1]);
+        return 1;
+    }
+    fprintf(f,
+            "{\n  \"hpipm_target\": \"%s\",\n  \"blasfeo_target\": \"%s\",\n"
+            "  \"N\": %d, \"nx\": %d, \"nu\": %d, \"box\": %s, \"ng\": %d, \"reps\": %d,\n"
+            "  \"modes\": {",
+            hpipm_target, blasfeo_target, p.N, p.nx, p.nu, p.box ? "true" : "false", p.ng, reps);
+    const char *mode_names[] = {"speed", "robust"};
+    enum hpipm_mode modes[] = {SPEED, ROBUST};
+    for (int m = 0; m < 2; ++m) {
+        printf("N=%d nx=%d nu=%d ng=%d, %s mode\n", p.N, p.nx, p.nu, p.ng, mode_names[m]);
+        fprintf(f, "%s\n    \"%s\": ", m ? "," : "", mode_names[m]);
+        benchmark_mode(f, &p, modes[m], reps);
+    }
+    fprintf(f, "\n  }\n}\n");
+    fclose(f);
+    free_problem(&p);
+    printf("Benchmark results written to %s\n", argv[1]);
+    return 0;
+}
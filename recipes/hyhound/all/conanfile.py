@@ -3,7 +3,16 @@ import os
 from conan import ConanFile
 from conan.tools.build import can_run
 from conan.tools.cmake import CMakeToolchain, CMake, cmake_layout, CMakeDeps
-from conan.tools.files import apply_conandata_patches, export_conandata_patches, get, save
+from conan.errors import ConanInvalidConfiguration
+from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, save
+
+# guanaqo options enabled by each value of the profiling option
+profiling_guanaqo_options = {
+    "off": [],
+    "tracing": ["with_tracing"],
+    "perfetto": ["with_perfetto"],
+    "itt": ["with_itt"],
+}
 
 
 class HyhoundRecipe(ConanFile):
@@ -28,12 +37,14 @@ class HyhoundRecipe(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
-        "real_type": ["double;float", "float;double", "double", "float"],  # affects ABI
+        "real_type": [None, "double;float", "float;double", "double", "float"],  # affects ABI
+        "profiling": list(profiling_guanaqo_options),  # affects ABI
     } | {k: [True, False] for k in bool_hyhound_options}
     default_options = {
         "shared": False,
         "fPIC": True,
-        "real_type": "double;float",
+        "real_type": None,
+        "profiling": "off",
     } | bool_hyhound_options
 
     def config_options(self):
@@ -43,12 +54,19 @@ class HyhoundRecipe(ConanFile):
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if self.options.real_type.value is None:
+            profile = self.conf.get("user.precision:profile", default="mixed", choices=["double", "float", "mixed"])
+            self.options.real_type = "double;float" if profile == "mixed" else profile
         self.options["guanaqo/*"].with_blas = True
+        # Enable the matching instrumentation in guanaqo
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            setattr(self.options["guanaqo/*"], opt, True)
 
     def export_sources(self):
         commit = self.conan_data["commits"][self.version]
         save(self, os.path.join(self.export_sources_folder, "commit.txt"), commit)
         export_conandata_patches(self)
+        copy(self, "install-benchmarks.cmake", self.recipe_folder, self.export_sources_folder)
 
     def source(self):
         get(
@@ -77,6 +95,14 @@ class HyhoundRecipe(ConanFile):
         if self.options.with_benchmarks:
             self.requires("benchmark/1.9.4")
 
+    def validate(self):
+        guanaqo = self.dependencies["guanaqo"]
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            if not guanaqo.options.get_safe(opt):
+                raise ConanInvalidConfiguration(
+                    f'"{self.name}/*:profiling={self.options.profiling}" option requires "guanaqo/*:{opt}=True"'
+                )
+
     def build_requirements(self):
         self.test_requires("gtest/1.17.0")
         self.tool_requires("cmake/[>=3.24 <5]")
@@ -94,8 +120,14 @@ class HyhoundRecipe(ConanFile):
         real_type = str(self.options.real_type)
         tc.variables["HYHOUND_DENSE_INDEX_TYPE"] = index_type
         tc.variables["HYHOUND_DENSE_REAL_TYPE"] = real_type
+        for opt in profiling_guanaqo_options[str(self.options.profiling)]:
+            tc.variables["HYHOUND_" + opt.upper()] = True
         if can_run(self):
             tc.variables["HYHOUND_FORCE_TEST_DISCOVERY"] = True
+        if self.options.with_benchmarks:
+            # The benchmark executables are not installed by CMake
+            install_benchmarks = os.path.join(self.export_sources_folder, "install-benchmarks.cmake")
+            tc.cache_variables["CMAKE_PROJECT_hyhound_INCLUDE"] = install_benchmarks.replace("\\", "/")
         tc.generate()
 
     def build(self):
@@ -110,4 +142,20 @@ class HyhoundRecipe(ConanFile):
 
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "none")
-        self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "hyhound"))
+        if not self.options.with_benchmarks:
+            self.cpp_info.builddirs.append(os.path.join("lib", "cmake", "hyhound"))
+            return
+        # Eigen is only used by the benchmarks, unless the OCP solvers are enabled
+        benchmark_deps = ["benchmark"] if self.options.with_ocp else ["benchmark", "eigen"]
+        main = self.cpp_info.components["hyhound"]
+        main.builddirs.append(os.path.join("lib", "cmake", "hyhound"))
+        main.requires = [
+            f"{dep.ref.name}::{dep.ref.name}"
+            for req, dep in self.dependencies.items()
+            if req.direct and not req.build and not req.test and dep.ref.name not in benchmark_deps
+        ]
+        benchmarks = self.cpp_info.components["benchmarks"]
+        benchmarks.libdirs = []
+        benchmarks.includedirs = []
+        benchmarks.bindirs = ["bin"]
+        benchmarks.requires = ["hyhound"] + [f"{name}::{name}" for name in benchmark_deps]
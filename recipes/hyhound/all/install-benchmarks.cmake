@@ -0,0 +1,28 @@
+# Installs the executables defined in the benchmarks directory, which hyhound
+# does not install itself. Included after hyhound's project() call through
+# CMAKE_PROJECT_hyhound_INCLUDE, the targets are collected at the end of the
+# top-level directory, when the benchmarks directory has been processed.
+
+function(conan_install_executables dir)
+    get_property(targets DIRECTORY "${dir}" PROPERTY BUILDSYSTEM_TARGETS)
+    foreach(tgt IN LISTS targets)
+        get_target_property(type ${tgt} TYPE)
+        if (type STREQUAL "EXECUTABLE")
+            install(TARGETS ${tgt} RUNTIME DESTINATION bin)
+        endif()
+    endforeach()
+    get_property(subdirs DIRECTORY "${dir}" PROPERTY SUBDIRECTORIES)
+    foreach(subdir IN LISTS subdirs)
+        conan_install_executables("${subdir}")
+    endforeach()
+endfunction()
+
+function(conan_install_benchmarks dir)
+    # Only if the benchmarks directory was added (e.g. WITH_BENCHMARKS=On)
+    get_property(subdirs DIRECTORY "${dir}" PROPERTY SUBDIRECTORIES)
+    if ("${dir}/benchmarks" IN_LIST subdirs)
+        conan_install_executables("${dir}/benchmarks")
+    endif()
+endfunction()
+
+cmake_language(DEFER CALL conan_install_benchmarks "${CMAKE_CURRENT_SOURCE_DIR}")
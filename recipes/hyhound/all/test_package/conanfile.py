@@ -1,26 +1,112 @@
+import glob
 import os
+import re
+import shlex
+import shutil
+from io import StringIO
 
 from conan import ConanFile
 from conan.tools.cmake import CMake, cmake_layout
 from conan.tools.build import can_run
+from conan.tools.files import save
 
 
 class HyhoundTestConan(ConanFile):
     settings = "os", "compiler", "build_type", "arch"
     generators = "CMakeDeps", "CMakeToolchain"
 
+    @property
+    def _benchmark(self):
+        return self.conf.get("user.hyhound:benchmark", default=False, check_type=bool)
+
     def requirements(self):
         self.requires(self.tested_reference_str)
+        if self._benchmark:
+            self.requires("benchmark/1.9.4")
+            self.requires("eigen/[~3.4 || ~5.0]")
 
     def build(self):
+        hyhound = self.dependencies[self.tested_reference_str]
+        variables = {"HYHOUND_BENCHMARK": self._benchmark}
+        if self._benchmark:
+            variables["HYHOUND_BENCHMARK_REAL_TYPE"] = str(hyhound.options.real_type)
         cmake = CMake(self)
-        cmake.configure()
+        cmake.configure(variables=variables)
         cmake.build()
 
     def layout(self):
         cmake_layout(self)
 
     def test(self):
+        self._check_precision()
         if can_run(self):
             cmd = os.path.join(self.cpp.build.bindir, "example")
             self.run(cmd, env="conanrun")
+            if self._benchmark:
+                self._run_benchmarks()
+
+    def _check_precision(self):
+        # With user.precision:profile=float, no hyhound template may be instantiated for double
+        hyhound = self.dependencies[self.tested_reference_str]
+        if str(hyhound.options.real_type) != "float" or not shutil.which("nm"):
+            return
+        nm = "nm -C -D --defined-only" if hyhound.options.shared else "nm -C --defined-only"
+        libdirs = hyhound.cpp_info.aggregated_components().libdirs
+        libs = [lib for d in libdirs for lib in glob.glob(os.path.join(d, "libhyhound*"))]
+        assert libs, f"hyhound libraries not found in {libdirs}"
+        for lib in libs:
+            self.run(f"{nm} {shlex.quote(lib)}", output := StringIO())
+            assert not re.search(r"\bhyhound::[^(\n]*<double\b", output.getvalue()), f"{lib} contains double precision symbols"
+
+    @property
+    def _benchmark_output_dir(self):
+        output_dir = self.conf.get("user.hyhound:benchmark_output_dir", check_type=str)
+        if not output_dir:
+            self.output.warning("Writing the hyhound benchmark results to the test_package build folder, which is "
+                                "removed by the next conan test or create. Set user.hyhound:benchmark_output_dir to keep them.")
+            return self.build_folder
+        return os.path.abspath(output_dir)
+
+    def _run_benchmarks(self):
+        hyhound = self.dependencies[self.tested_reference_str]
+        output_dir = self._benchmark_output_dir
+        benchmark_filter = self.conf.get("user.hyhound:benchmark_filter", default=None, check_type=str)
+        min_time = self.conf.get("user.hyhound:benchmark_min_time", default=None, check_type=str)
+        # Record the configuration in the context of the JSON output
+        context = {
+            "hyhound_version": str(hyhound.ref.version),
+            "build_type": str(self.settings.build_type),
+            "compiler": f"{self.settings.compiler} {self.settings.compiler.version}",
+            "arch": str(self.settings.arch),
+        }
+        for opt in ["real_type", "with_ocp", "profiling", "shared"]:
+            value = hyhound.options.get_safe(opt)
+            if value is not None and value.value is not None:
+                context[opt] = str(value)
+        index_type = self.dependencies["guanaqo"].options.get_safe("blas_index_type")
+        if index_type is not None:
+            context["index_type"] = str(index_type)
+        # The comparison with Eigen's LLT from this test package, followed by
+        # the benchmarks packaged with hyhound/*:with_benchmarks=True
+        executables = [os.path.join(self.cpp.build.bindir, "update_benchmark")]
+        if hyhound.options.with_benchmarks:
+            bindirs = hyhound.cpp_info.components["benchmarks"].bindirs
+            # Only the benchmarks are installed as executables (shared libraries
+            # may be installed to bin on Windows)
+            executables += sorted(
+                exe for d in bindirs for exe in glob.glob(os.path.join(d, "*"))
+                if os.path.splitext(exe)[1] in ("", ".exe") and os.access(exe, os.X_OK)
+            )
+        for exe in executables:
+            # Google Benchmark splits the context on commas
+            context_arg = ",".join(f"{k}={v.replace(',', ';')}" for k, v in context.items())
+            args = [exe, "--benchmark_format=json", f"--benchmark_context={context_arg}"]
+            if benchmark_filter:
+                args.append(f"--benchmark_filter={benchmark_filter}")
+            if min_time:
+                args.append(f"--benchmark_min_time={min_time}")
+            self.run(" ".join(shlex.quote(a) for a in args), stdout=(output := StringIO()), env="conanrun")
+            name = os.path.splitext(os.path.basename(exe))[0]
+            result = os.path.join(output_dir, f"hyhound-{hyhound.ref.version}-{name}.json")
+            save(self, result, output.getvalue())
+            self.output.info(f"hyhound benchmark results: {result}")
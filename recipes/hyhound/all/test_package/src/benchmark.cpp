@@ -0,0 +1,113 @@
+#include <hyhound/householder-updowndate.hpp>
+
+#include <Eigen/Cholesky>
+#include <Eigen/Core>
+#include <benchmark/benchmark.h>
+
+#include <random>
+
+// Compares a rank-k update of a Cholesky factorization using hyperbolic
+// Householder transformations to the alternatives in Eigen:
+//  - refactorizing H + A Aᵀ from scratch using LLT,
+//  - k rank-one updates using LLT::rankUpdate.
+// The copies of the inputs are included in the timings of all variants.
+
+namespace {
+
+template <class T>
+using Mat = Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic>;
+
+template <class T>
+hyhound::MatrixView<T> view(Mat<T> &M) {
+    return {{.data = M.data(),
+             .rows = static_cast<hyhound::index_t>(M.rows()),
+             .cols = static_cast<hyhound::index_t>(M.cols())}};
+}
+
+template <class T>
+struct Problem {
+    Mat<T> H, L, A;
+    Problem(Eigen::Index n, Eigen::Index k) {
+        std::mt19937 rng{12345};
+        std::normal_distribution<T> dist;
+        auto rand = [&] { return dist(rng); };
+        Mat<T> R = Mat<T>::NullaryExpr(n, n, rand);
+        H = R * R.transpose() + T(n) * Mat<T>::Identity(n, n);
+        L = H.llt().matrixL();
+        A = Mat<T>::NullaryExpr(n, k, rand);
+    }
+};
+
+void set_counters(benchmark::State &state) {
+    auto n = static_cast<double>(state.range(0)), k = static_cast<double>(state.range(1));
+    state.counters["n"] = n;
+    state.counters["k"] = k;
+}
+
+template <class T>
+void hyhound_update(benchmark::State &state) {
+    Problem<T> p{state.range(0), state.range(1)};
+    Mat<T> L = p.L, A = p.A;
+    // Check the result before timing
+    hyhound::update_cholesky(view(L), view(A), hyhound::Update{});
+    Mat<T> Lt = L.template triangularView<Eigen::Lower>();
+    Mat<T> Ht = p.H + p.A * p.A.transpose();
+    auto rel_err = (Lt * Lt.transpose() - Ht).norm() / Ht.norm();
+    if (rel_err > 1e3 * Eigen::NumTraits<T>::epsilon())
+        state.SkipWithError("hyhound::update_cholesky gave an inaccurate result");
+    for (auto _ : state) {
+        L = p.L;
+        A = p.A;
+        hyhound::update_cholesky(view(L), view(A), hyhound::Update{});
+        benchmark::DoNotOptimize(L.data());
+        benchmark::ClobberMemory();
+    }
+    set_counters(state);
+}
+
+template <class T>
+void eigen_llt_refactorization(benchmark::State &state) {
+    Problem<T> p{state.range(0), state.range(1)};
+    Mat<T> Ht = p.H;
+    for (auto _ : state) {
+        Ht = p.H;
+        Ht.template selfadjointView<Eigen::Lower>().rankUpdate(p.A);
+        Eigen::LLT<Eigen::Ref<Mat<T>>> llt{Ht}; // in-place
+        benchmark::DoNotOptimize(Ht.data());
+        benchmark::ClobberMemory();
+    }
+    set_counters(state);
+}
+
+template <class T>
+void eigen_llt_rank_one_updates(benchmark::State &state) {
+    Problem<T> p{state.range(0), state.range(1)};
+    Eigen::LLT<Mat<T>> llt0{p.H}, llt = llt0;
+    for (auto _ : state) {
+        llt = llt0;
+        for (Eigen::Index j = 0; j < p.A.cols(); ++j)
+            llt.rankUpdate(p.A.col(j));
+        benchmark::DoNotOptimize(llt.matrixLLT().data());
+        benchmark::ClobberMemory();
+    }
+    set_counters(state);
+}
+
+void sizes_and_ranks(benchmark::internal::Benchmark *b) {
+    b->ArgNames({"n", "k"});
+    b->ArgsProduct({benchmark::CreateRange(8, 512, 2), benchmark::CreateRange(1, 64, 4)});
+}
+
+} // namespace
+
+#define HYHOUND_BENCHMARK_REAL_TYPE(T)                                         \
+    BENCHMARK_TEMPLATE(hyhound_update, T)->Apply(sizes_and_ranks);             \
+    BENCHMARK_TEMPLATE(eigen_llt_refactorization, T)->Apply(sizes_and_ranks);  \
+    BENCHMARK_TEMPLATE(eigen_llt_rank_one_updates, T)->Apply(sizes_and_ranks)
+
+#ifdef HYHOUND_BENCHMARK_DOUBLE
+HYHOUND_BENCHMARK_REAL_TYPE(double);
+#endif
+#ifdef HYHOUND_BENCHMARK_FLOAT
+HYHOUND_BENCHMARK_REAL_TYPE(float);
+#endif
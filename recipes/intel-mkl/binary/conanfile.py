@@ -0,0 +1,171 @@
+import glob
+import os
+
+from conan import ConanFile
+from conan.tools.files import copy, get, rmdir
+from conan.errors import ConanInvalidConfiguration
+
+
+class IntelMKLConan(ConanFile):
+    name = "intel-mkl"
+    package_type = "shared-library"
+    description = "Intel oneAPI Math Kernel Library (oneMKL), repackaged from the PyPI wheels."
+    homepage = "https://www.intel.com/content/www/us/en/developer/tools/oneapi/onemkl.html"
+    license = "LicenseRef-Intel-Simplified-Software-License"
+    settings = "os", "compiler", "arch"
+    python_requires = "tttapa-conan-utils/1.0.0"
+
+    options = {
+        "interface": ["lp64", "ilp64"],
+        "threading": ["sequential", "tbb", "openmp"],
+    }
+    default_options = {
+        "interface": "lp64",
+        "threading": "sequential",
+    }
+    options_description = {
+        "interface": "Integer size of the BLAS/LAPACK interface: 32-bit (lp64) or 64-bit (ilp64)",
+        "threading": "Threading layer: sequential, oneTBB or OpenMP",
+    }
+
+    @property
+    def _openmp_runtime(self):
+        if self.options.threading != "openmp":
+            return None
+        return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self, default="libiomp5")
+
+    def requirements(self):
+        if self._openmp_runtime == "libomp":
+            # libomp implements the libiomp5 ABI used by mkl_intel_thread
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self))
+
+    def validate(self):
+        supported_os = ("Linux", "Windows")
+        if self.settings.arch != "x86_64" or self.settings.os not in supported_os:
+            msg = f"This package is not compatible with {self.settings.os}-{self.settings.arch}. "
+            msg += "It can only run on Linux-x86_64 and Windows-x86_64."
+            raise ConanInvalidConfiguration(msg)
+        if self._openmp_runtime == "libgomp":
+            if self.settings.os != "Linux":
+                msg = f'"{self.name}/*:threading=openmp" with libgomp is only available on Linux'
+                raise ConanInvalidConfiguration(msg)
+            if self.settings.compiler != "gcc":
+                msg = f'"{self.name}/*:threading=openmp" with user.openmp:runtime=libgomp requires GCC'
+                raise ConanInvalidConfiguration(msg)
+
+    def package_id(self):
+        # Both interfaces are always packaged, the option only selects the
+        # component that is linked by MKL::MKL
+        del self.info.options.interface
+        if self.info.options.threading == "openmp":
+            utils = self.python_requires["tttapa-conan-utils"].module
+            runtime = utils.default_openmp_runtime.get(str(self.info.settings.compiler), "libiomp5")
+            runtime = self.conf.get("user.openmp:runtime", default=runtime)
+            self.info.conf.define("user.openmp:runtime", runtime)
+
+    def package(self):
+        def install_wheel(pkg_name, pattern="*", excludes=()):
+            pkg = self.conan_data["sources"][self.version][str(self.settings.os)][pkg_name]
+            wheel_dir = os.path.join(self.build_folder, pkg_name)
+            get(self, **pkg, destination=wheel_dir)
+            # The Windows wheels use the conda layout (Library/{bin,lib,include})
+            data_dir = glob.glob(os.path.join(wheel_dir, "*.data", "data"))[0]
+            if os.path.isdir(os.path.join(data_dir, "Library")):
+                data_dir = os.path.join(data_dir, "Library")
+            copy(self, pattern, data_dir, self.package_folder, excludes=["share/*", *excludes])
+            licenses_dir = os.path.join(self.package_folder, "licenses", pkg_name)
+            copy(self, "*.dist-info/LICENSE.txt", wheel_dir, licenses_dir, keep_path=False)
+            copy(self, "*", os.path.join(data_dir, "share", "doc"), licenses_dir, keep_path=False)
+
+        install_wheel("mkl")
+        install_wheel("mkl-include")
+        install_wheel("mkl-devel")
+        if self.options.threading == "tbb":
+            install_wheel("tbb")
+        elif self._openmp_runtime == "libiomp5":
+            # Only the host runtime, not the offloading libraries
+            install_wheel("intel-openmp", pattern="*/libiomp5*", excludes=["*.a", "*.dbg", "*.pdb", "*_db.*"])
+        # Conan generates its own CMake and pkg-config files with the selected
+        # interface and threading layer
+        rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
+        rmdir(self, os.path.join(self.package_folder, "lib", "pkgconfig"))
+
+        # The Linux wheels only contain versioned libraries (libmkl_core.so.2,
+        # libtbb.so.12), the linker needs the unversioned names as well
+        if self.settings.os == "Linux":
+            for lib in sorted(glob.glob(os.path.join(self.package_folder, "lib", "lib*.so.*"))):
+                unversioned = lib[: lib.index(".so.") + len(".so")]
+                if not os.path.lexists(unversioned):
+                    os.symlink(os.path.basename(lib), unversioned)
+
+    def package_info(self):
+        self.cpp_info.set_property("cmake_file_name", "MKL")
+        self.cpp_info.set_property("cmake_target_name", "MKL::MKL")
+        self.cpp_info.set_property("pkg_config_name", "mkl")
+        suffix = "_dll" if self.settings.os == "Windows" else ""
+        bindirs = ["bin"] if self.settings.os == "Windows" else []
+
+        def add_component(name, requires=()):
+            component = self.cpp_info.components[name]
+            component.set_property("cmake_target_name", f"MKL::{name}")
+            component.libs = [name + suffix]
+            component.bindirs = bindirs
+            component.requires = list(requires)
+            return component
+
+        core = add_component("mkl_core")
+        if self.settings.os == "Linux":
+            core.system_libs = ["pthread", "m", "dl"]
+
+        # Threading layer
+        runtime = self._openmp_runtime
+        if self.options.threading == "sequential":
+            thread = "mkl_sequential"
+            add_component(thread, ["mkl_core"])
+        elif self.options.threading == "tbb":
+            tbb = self.cpp_info.components["tbb"]
+            tbb.set_property("cmake_target_name", "MKL::tbb")
+            tbb.libs = ["tbb"] if self.settings.os == "Linux" else []
+            tbb.bindirs = bindirs
+            tbb.includedirs = []
+            thread = "mkl_tbb_thread"
+            add_component(thread, ["mkl_core", "tbb"])
+            if self.settings.os == "Linux":
+                self.cpp_info.components[thread].system_libs = ["stdc++"]
+        elif runtime == "libgomp":
+            thread = "mkl_gnu_thread"
+            add_component(thread, ["mkl_core"])
+            self.cpp_info.components[thread].sharedlinkflags.append("-fopenmp")
+            self.cpp_info.components[thread].exelinkflags.append("-fopenmp")
+        elif runtime == "libomp":
+            thread = "mkl_intel_thread"
+            add_component(thread, ["mkl_core", "llvm-openmp::llvm-openmp"])
+        else:
+            iomp5 = self.cpp_info.components["iomp5"]
+            iomp5.set_property("cmake_target_name", "MKL::iomp5")
+            iomp5.libs = ["iomp5"] if self.settings.os == "Linux" else ["libiomp5md"]
+            iomp5.bindirs = bindirs
+            iomp5.includedirs = []
+            thread = "mkl_intel_thread"
+            add_component(thread, ["mkl_core", "iomp5"])
+
+        # LP64/ILP64 interface layer. MKL::MKL links the interface selected by
+        # the interface option, linking both would silently mix 32-bit and
+        # 64-bit integer BLAS symbols.
+        interface = add_component(f"mkl_intel_{self.options.interface}", [thread])
+        if self.options.interface == "ilp64":
+            interface.defines = ["MKL_ILP64"]
+
+        # Thread budget shared by all packages in the graph
+        if self.options.threading == "openmp":
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
+        threads = self.conf.get("user.threads:budget", check_type=int)
+        if threads and self.options.threading != "sequential":
+            self.runenv_info.define("MKL_NUM_THREADS", str(threads))
+        # Limit the instruction set used by MKL's CPU dispatcher, e.g. AVX2 to
+        # get reproducible results on heterogeneous clusters
+        instructions = self.conf.get("user.intel-mkl:enable_instructions", check_type=str)
+        if instructions:
+            self.runenv_info.define("MKL_ENABLE_INSTRUCTIONS", instructions)
+
+        self.buildenv_info.define_path("MKLROOT", self.package_folder)
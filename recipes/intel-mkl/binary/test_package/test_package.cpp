@@ -0,0 +1,21 @@
+#include <mkl.h>
+#include <stdio.h>
+
+int main()
+{
+  char version[198];
+  mkl_get_version_string(version, sizeof(version));
+  printf("%s\n", version);
+  printf("sizeof(MKL_INT) = %d, max threads = %d\n", (int)sizeof(MKL_INT), mkl_get_max_threads());
+
+  double A[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
+  double B[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
+  double C[9] = {.5,.5,.5,.5,.5,.5,.5,.5,.5};
+  cblas_dgemm(CblasColMajor, CblasNoTrans, CblasTrans,3,3,2,1,A, 3, B, 3,2,C,3);
+
+  for(int i=0; i<9; i++)
+    printf("%lf ", C[i]);
+  printf("\n");
+  // Expected result of the product above (both for LP64 and ILP64)
+  return C[0] == 11.0 && C[4] == 21.0 && C[8] == 3.0 ? 0 : 1;
+}
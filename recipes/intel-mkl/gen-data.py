@@ -0,0 +1,70 @@
+import json
+import urllib.parse
+import urllib.request
+import yaml
+from pathlib import Path
+
+PYPI_URL: str = "https://pypi.org/pypi"
+
+# Wheel platform tag for each Conan OS (x86_64 only)
+PLATFORM_TAGS: dict[str, str] = {
+    "Linux": "manylinux_2_28_x86_64",
+    "Windows": "win_amd64",
+}
+
+# Versions of the wheels that make up each oneMKL release (the mkl wheel pins
+# compatible versions of intel-openmp and tbb)
+MKL_VERSIONS: dict[str, dict[str, str]] = {
+    "2025.2.0": {
+        "mkl": "2025.2.0",
+        "mkl-include": "2025.2.0",
+        "mkl-devel": "2025.2.0",
+        "intel-openmp": "2025.2.0",
+        "tbb": "2022.2.0",
+    },
+}
+
+
+def fetch_json(url: str) -> dict:
+    print(f"Fetching {url}...")
+    with urllib.request.urlopen(url) as response:
+        return json.load(response)
+
+
+def generate_conandata(mkl_version: str, packages: dict[str, str], conandata: dict):
+    sources = conandata.setdefault("sources", {}).setdefault(mkl_version, {})
+    for pkg, pkg_version in packages.items():
+        url = f"{PYPI_URL}/{pkg}/json"
+        files = fetch_json(url)["releases"][pkg_version]
+        for os_name, tag in PLATFORM_TAGS.items():
+            try:
+                wheel = next(f for f in files if f["filename"].endswith(f"-{tag}.whl"))
+                sources.setdefault(os_name, {})[pkg] = {
+                    "url": urllib.parse.urljoin(url, wheel["url"]),
+                    "sha256": wheel["digests"]["sha256"],
+                }
+            except StopIteration:
+                print(f"Skipping {pkg}: no {tag} wheel")
+
+
+def main():
+    script_dir = Path(__file__).resolve().parent
+
+    conandata = {}
+    for mkl_version, packages in MKL_VERSIONS.items():
+        generate_conandata(mkl_version, packages, conandata)
+
+    conandata_file = script_dir / "binary" / "conandata.yml"
+    with open(conandata_file, "w") as f:
+        yaml.dump(conandata, f, default_flow_style=False, sort_keys=False)
+    print(f"Conandata written to {conandata_file}")
+
+    config_file = script_dir / "config.yml"
+    folders = {"versions": {v: {"folder": "binary"} for v in MKL_VERSIONS}}
+    with open(config_file, "w") as f:
+        yaml.dump(folders, f, default_flow_style=False, sort_keys=False)
+    print(f"Config written to {config_file}")
+
+
+if __name__ == "__main__":
+    main()
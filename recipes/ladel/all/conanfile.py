@@ -23,11 +23,15 @@ class LADELRecipe(ConanFile):
         "shared": [True, False],
         "fPIC": [True, False],
         "with_mex": [True, False],
+        "with_amd": [True, False],
+        "long_index": [True, False],  # affects ABI
     }
     default_options = {
         "shared": False,
         "fPIC": True,
         "with_mex": False,
+        "with_amd": True,
+        "long_index": True,
     }
 
     def config_options(self):
@@ -65,6 +69,10 @@ class LADELRecipe(ConanFile):
         tc = CMakeToolchain(self)
         if self.options.get_safe("with_mex"):
             tc.variables["LADEL_WITH_MEX"] = True
+        # Fill-reducing ordering using the SuiteSparse AMD sources bundled with LADEL
+        tc.variables["LADEL_USE_AMD"] = bool(self.options.with_amd)
+        # 64-bit ladel_int, required when the number of nonzeros in the factor exceeds 2^31
+        tc.variables["LADEL_64BIT_INDICES"] = bool(self.options.long_index)
         if can_run(self):
             tc.variables["LADEL_FORCE_TEST_DISCOVERY"] = True
         tc.generate()
@@ -13,8 +13,9 @@ class LADELTestConan(ConanFile):
         self.requires(self.tested_reference_str)
 
     def build(self):
+        ladel = self.dependencies[self.tested_reference_str]
         cmake = CMake(self)
-        cmake.configure()
+        cmake.configure(variables={"LADEL_LONG_INDEX": bool(ladel.options.long_index)})
         cmake.build()
 
     def layout(self):
@@ -1,5 +1,84 @@
 #include <ladel.h>
 
+#define N 100
+
+#if defined(EXPECT_LADEL_64BIT_INDICES) != defined(LADEL_64BIT_INDICES)
+#error "ladel_int does not match the long_index option of the LADEL package"
+#endif
+
+#ifdef LADEL_64BIT_INDICES
+// A tall matrix with more rows than a 32-bit ladel_int can index
+static int check_long_index(void) {
+    const ladel_int nrow = (ladel_int)3 << 30;
+    ladel_sparse_matrix *M = ladel_sparse_alloc(nrow, 2, 3, UNSYMMETRIC, TRUE, FALSE);
+    M->p[0] = 0;
+    M->i[0] = 1;
+    M->x[0] = 1;
+    M->p[1] = 1;
+    M->i[1] = 0;
+    M->x[1] = 2;
+    M->i[2] = nrow - 1;
+    M->x[2] = 3;
+    M->p[2] = 3;
+    ladel_int cols[] = {1};
+    ladel_sparse_matrix *sub = ladel_column_submatrix(M, cols, 1);
+    int ok = sub->nrow == nrow && sub->p[1] == 2 && sub->i[1] == nrow - 1 && sub->x[1] == 3;
+    ladel_print("LADEL: %" LADEL_PRIi " rows: %s\n", sub->nrow, ok ? "ok" : "failed");
+    ladel_sparse_free(sub);
+    ladel_sparse_free(M);
+    return ok ? 0 : 1;
+}
+#endif
+
 int main(void) {
     ladel_print("LADEL: %s\n", "ok");
+
+    // Arrowhead matrix with a dense first row and column (upper part only).
+    // Eliminating the first column fills in all of L, the AMD ordering moves
+    // it to the end and avoids all fill-in. Without LADEL_USE_AMD, the AMD
+    // ordering is not available and must not be requested.
+#ifdef LADEL_USE_AMD
+    ladel_int ordering = AMD;
+#else
+    ladel_int ordering = NO_ORDERING;
+#endif
+    ladel_sparse_matrix *M = ladel_sparse_alloc(N, N, 2 * N - 1, UPPER, TRUE, FALSE);
+    ladel_int nz = 0;
+    M->p[0] = 0;
+    for (ladel_int col = 0; col < N; col++) {
+        if (col > 0) {
+            M->i[nz] = 0;
+            M->x[nz++] = 1;
+        }
+        M->i[nz] = col;
+        M->x[nz++] = N;
+        M->p[col + 1] = nz;
+    }
+
+    ladel_work *work = ladel_workspace_allocate(N);
+    ladel_symbolics *sym = ladel_symbolics_alloc(N);
+    ladel_factor *LD = NULL;
+    if (ladel_factorize(M, sym, ordering, &LD, work) != SUCCESS) {
+        ladel_print("LADEL: factorization failed\n");
+        return 1;
+    }
+    ladel_int nnz_L = LD->L->p[N];
+    ladel_print("LADEL: nnz(L) = %" LADEL_PRIi " (AMD: %s)\n", nnz_L, sym->p ? "yes" : "no");
+    int status = 0;
+#ifdef LADEL_USE_AMD
+    if (nnz_L != N - 1) {
+        ladel_print("LADEL: unexpected fill-in with the AMD ordering\n");
+        status = 1;
+    }
+#endif
+
+#ifdef LADEL_64BIT_INDICES
+    status |= check_long_index();
+#endif
+
+    ladel_factor_free(LD);
+    ladel_symbolics_free(sym);
+    ladel_workspace_free(work);
+    ladel_sparse_free(M);
+    return status;
 }
@@ -9,6 +9,7 @@ class TorchConan(ConanFile):
     name = "libtorch"
     package_type = "shared-library"
     settings = "os", "compiler", "arch"
+    python_requires = "tttapa-conan-utils/1.0.0"
 
     options = {"cuda_version": [None, "12.4"]}
     default_options = {"cuda_version": None}
@@ -23,6 +24,10 @@ class TorchConan(ConanFile):
         if self.settings.os == "Linux" and cxx11 and cxx11 != "libstdc++11":
             msg = f"This package currently only supports libstdc++11, not {cxx11}"
             raise ConanInvalidConfiguration(msg)
+        if self.settings.os == "Linux" and self.conf.get("user.openmp:runtime") == "libomp":
+            msg = "The Linux binaries of libtorch bundle their own libgomp, "
+            msg += "which conflicts with user.openmp:runtime=libomp"
+            raise ConanInvalidConfiguration(msg)
 
     def package(self):
         cuda_version = self.options.get_safe("cuda_version")
@@ -39,3 +44,6 @@ class TorchConan(ConanFile):
         self.cpp_info.builddirs.append(os.path.join("share", "cmake", "Torch"))
         self.cpp_info.builddirs.append(os.path.join("share", "cmake", "fbgemm"))
         self.cpp_info.builddirs.append(os.path.join("share", "cmake", "kineto"))
+        # Thread budget shared by all packages in the graph, used by the
+        # intra-op thread pool
+        self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
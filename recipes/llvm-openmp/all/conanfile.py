@@ -28,6 +28,7 @@ class LLVMOpenMpConan(ConanFile):
 
     package_type = "library"
     settings = "os", "arch", "compiler", "build_type"
+    python_requires = "tttapa-conan-utils/1.0.0"
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
@@ -72,6 +73,10 @@ class LLVMOpenMpConan(ConanFile):
             raise ConanInvalidConfiguration(msg)
         if Version(self.version).major >= 17:
             check_min_cppstd(self, 17)
+        if self.conf.get("user.openmp:runtime") == "libgomp":
+            msg = "llvm-openmp conflicts with user.openmp:runtime=libgomp, "
+            msg += "the dependency graph should only contain a single OpenMP runtime"
+            raise ConanInvalidConfiguration(msg)
 
     def build_requirements(self):
         if Version(self.version).major >= 17:
@@ -154,3 +159,5 @@ class LLVMOpenMpConan(ConanFile):
         elif self.settings.compiler == "intel-cc":
             self.cpp_info.cxxflags = ["/Qopenmp"] if self.settings.os == "Windows" else ["-Qopenmp"]
         self.cpp_info.cflags = self.cpp_info.cxxflags
+        # Thread budget shared by all packages in the graph
+        self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
@@ -57,6 +57,104 @@ conan_arch_to_openblas_target = {
 # Taken from OpenBLAS TargetList.txt
 available_openblas_targets = ["P2", "KATMAI", "COPPERMINE", "NORTHWOOD", "PRESCOTT", "BANIAS", "YONAH", "CORE2", "PENRYN", "DUNNINGTON", "NEHALEM", "SANDYBRIDGE", "HASWELL", "SKYLAKEX", "ATOM", "COOPERLAKE", "SAPPHIRERAPIDS", "ATHLON", "OPTERON", "OPTERON_SSE3", "BARCELONA", "SHANGHAI", "ISTANBUL", "BOBCAT", "BULLDOZER", "PILEDRIVER", "STEAMROLLER", "EXCAVATOR", "ZEN", "SSE_GENERIC", "VIAC3", "NANO", "POWER4", "POWER5", "POWER6", "POWER7", "POWER8", "POWER9", "POWER10", "PPCG4", "PPC970", "PPC970MP", "PPC440", "PPC440FP2", "CELL", "P5600", "MIPS1004K", "MIPS24K", "MIPS64_GENERIC", "SICORTEX", "LOONGSON3A", "LOONGSON3B", "I6400", "P6600", "I6500", "ITANIUM2", "SPARC", "SPARCV7", "CORTEXA15", "CORTEXA9", "ARMV7", "ARMV6", "ARMV5", "ARMV8", "CORTEXA53", "CORTEXA57", "CORTEXA72", "CORTEXA73", "CORTEXA76", "CORTEXA510", "CORTEXA710", "CORTEXX1", "CORTEXX2", "NEOVERSEN1", "NEOVERSEV1", "NEOVERSEN2", "CORTEXA55", "EMAG8180", "FALKOR", "THUNDERX", "THUNDERX2T99", "TSV110", "THUNDERX3T110", "VORTEX", "A64FX", "ARMV8SVE", "FT2000", "ZARCH_GENERIC", "Z13", "Z14", "RISCV64_GENERIC", "RISCV64_ZVL128B", "C910V", "x280", "RISCV64_ZVL256B", "LOONGSONGENERIC", "LOONGSON3R5", "LOONGSON2K1000", "E2K", "EV4", "EV5", "EV6", "CSKY", "CK860FV"]
 
+# Maps GCC/Clang -march and -mcpu values to the corresponding OpenBLAS TARGET,
+# grouped by the generic TARGET from conan_arch_to_openblas_target:
+compiler_cpu_to_openblas_target = {
+    "SANDYBRIDGE": {
+        "x86-64-v2": "NEHALEM",
+        "x86-64-v3": "HASWELL",
+        "x86-64-v4": "SKYLAKEX",
+        "core2": "CORE2",
+        "penryn": "PENRYN",
+        "nehalem": "NEHALEM",
+        "westmere": "NEHALEM",
+        "sandybridge": "SANDYBRIDGE",
+        "ivybridge": "SANDYBRIDGE",
+        "haswell": "HASWELL",
+        "broadwell": "HASWELL",
+        "skylake": "HASWELL",
+        "alderlake": "HASWELL",
+        "raptorlake": "HASWELL",
+        "meteorlake": "HASWELL",
+        "skylake-avx512": "SKYLAKEX",
+        "cascadelake": "SKYLAKEX",
+        "icelake-client": "SKYLAKEX",
+        "icelake-server": "SKYLAKEX",
+        "tigerlake": "SKYLAKEX",
+        "rocketlake": "SKYLAKEX",
+        "cooperlake": "COOPERLAKE",
+        "sapphirerapids": "SAPPHIRERAPIDS",
+        "emeraldrapids": "SAPPHIRERAPIDS",
+        "graniterapids": "SAPPHIRERAPIDS",
+        "atom": "ATOM",
+        "bonnell": "ATOM",
+        "btver1": "BOBCAT",
+        "bdver1": "BULLDOZER",
+        "bdver2": "PILEDRIVER",
+        "bdver3": "STEAMROLLER",
+        "bdver4": "EXCAVATOR",
+        "znver1": "ZEN",
+        "znver2": "ZEN",
+        "znver3": "ZEN",
+        "znver4": "SKYLAKEX",  # OpenBLAS uses the AVX-512 kernels for Zen 4 and 5
+        "znver5": "SKYLAKEX",
+    },
+    "ARMV8": {
+        "armv8-a": "ARMV8",
+        "armv8.2-a": "ARMV8",
+        "armv8.2-a+sve": "ARMV8SVE",
+        "armv9-a": "ARMV8SVE",
+        "cortex-a53": "CORTEXA53",
+        "cortex-a55": "CORTEXA55",
+        "cortex-a57": "CORTEXA57",
+        "cortex-a72": "CORTEXA72",
+        "cortex-a73": "CORTEXA73",
+        "cortex-a76": "CORTEXA76",
+        "cortex-a510": "CORTEXA510",
+        "cortex-a710": "CORTEXA710",
+        "cortex-x1": "CORTEXX1",
+        "cortex-x2": "CORTEXX2",
+        "neoverse-n1": "NEOVERSEN1",
+        "neoverse-v1": "NEOVERSEV1",
+        "neoverse-n2": "NEOVERSEN2",
+        "a64fx": "A64FX",
+        "falkor": "FALKOR",
+        "thunderx": "THUNDERX",
+        "thunderx2t99": "THUNDERX2T99",
+        "thunderx3t110": "THUNDERX3T110",
+        "tsv110": "TSV110",
+        "apple-m1": "VORTEX",
+        "apple-m2": "VORTEX",
+    },
+    "ARMV7": {
+        "armv7-a": "ARMV7",
+        "armv8-a": "ARMV7",  # No 32-bit ARMv8 TARGET in OpenBLAS
+        "cortex-a7": "ARMV7",
+        "cortex-a9": "CORTEXA9",
+        "cortex-a15": "CORTEXA15",
+        "cortex-a53": "ARMV7",
+        "cortex-a72": "ARMV7",
+    },
+    "ARMV6": {
+        "armv6": "ARMV6",
+        "armv6zk": "ARMV6",
+        "arm1176jzf-s": "ARMV6",
+    },
+}
+
+# x86_64 and armv8 OpenBLAS TARGETs with optimized small matrix GEMM kernels
+# (the generic SMALL_MATRIX_OPT kernels of the other TARGETs are never selected)
+small_matrix_opt_targets = ["SKYLAKEX", "COOPERLAKE", "SAPPHIRERAPIDS", "NEOVERSEV1", "NEOVERSEN2", "ARMV8SVE", "A64FX"]
+
+# Maps the tttapa-toolchains target (arch.toolchain-cpu, os.toolchain-vendor)
+# to the corresponding OpenBLAS TARGET:
+toolchain_to_openblas_target = {
+    ("aarch64", "rpi3"): "CORTEXA53",
+    ("armv8", "rpi3"): "ARMV7",  # No 32-bit ARMv8 TARGET in OpenBLAS
+    ("armv7", "neon"): "ARMV7",
+    ("armv6", "rpi"): "ARMV6",
+}
+
 
 class OpenblasConan(ConanFile):
     name = "openblas"
@@ -67,16 +165,30 @@ class OpenblasConan(ConanFile):
     topics = ("blas", "lapack")
     package_type = "library"
     settings = "os", "arch", "compiler", "build_type"
+    python_requires = "tttapa-conan-utils/1.0.0"
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
         "build_lapack": [True, False],
         "build_relapack": [True, False],
-        "no_fortran": [True, False],
-        "shared_libgfortran": [True, False],
+        "build_single": [True, False],
+        "build_double": [True, False],
+        "build_complex": [True, False],
+        "build_complex16": [True, False],
+        "no_fortran": [None, True, False],
+        "shared_libgfortran": [None, True, False],
+        "interface64": [True, False],
         "use_thread": [True, False],
+        "threading": [None, "serial", "pthread", "openmp"],
         "use_locking": [True, False],
+        "num_threads": [None, "ANY"],
+        "num_parallel": [None, "ANY"],
+        "buffersize": [None, "ANY"],
+        "gemm_multithread_threshold": [None, "ANY"],
+        "thread_timeout": [None, "ANY"],
         "dynamic_arch": [True, False],
+        "dynamic_list": [None, "ANY"],
+        "small_matrix_opt": [None, True, False],
         "target": [None] + available_openblas_targets
     }
     default_options = {
@@ -84,23 +196,54 @@ class OpenblasConan(ConanFile):
         "fPIC": True,
         "build_lapack": True,
         "build_relapack": False,
-        "no_fortran": True,
-        "shared_libgfortran": True,
+        "build_single": True,
+        "build_double": True,
+        "build_complex": True,
+        "build_complex16": True,
+        "no_fortran": None,
+        "shared_libgfortran": None,
+        "interface64": False,
         "use_thread": True,
+        "threading": None,
         "use_locking": True,
+        "num_threads": None,
+        "num_parallel": None,
+        "buffersize": None,
+        "gemm_multithread_threshold": None,
+        "thread_timeout": None,
         "dynamic_arch": False,
+        "dynamic_list": None,
+        "small_matrix_opt": None,
         "target": None,
     }
     options_description = {
         "build_lapack": "Build LAPACK and LAPACKE",
         "build_relapack": "Build with ReLAPACK (recursive implementation of several LAPACK functions on top of standard LAPACK)",
-        "use_thread": "Enable threads support",
+        "build_single": "Build the single precision real (s) routines",
+        "build_double": "Build the double precision real (d) routines",
+        "build_complex": "Build the single precision complex (c) routines (requires build_single)",
+        "build_complex16": "Build the double precision complex (z) routines (requires build_double)",
+        "no_fortran": "Build LAPACK from its f2c-translated C sources instead of Fortran (defaults to True unless tools.build:compiler_executables in the profile contains a Fortran compiler)",
+        "shared_libgfortran": "Link to the shared libgfortran (defaults to False when cross-compiling)",
+        "interface64": "Use 64-bit integers for array indices (ILP64 interface)",
+        "use_thread": "Enable threads support (superseded by threading)",
+        "threading": "Threading backend: serial, pthread or openmp (defaults to pthread if use_thread=True, serial otherwise)",
         "use_locking": "Use locks even in single-threaded builds to make them callable from multiple threads",
+        "num_threads": "Maximum number of threads (NUM_THREADS, defaults to the number of cores of the build machine)",
+        "num_parallel": "Number of concurrent callers that each get their own memory buffer pool (NUM_PARALLEL)",
+        "buffersize": "Size of the thread buffers as a power of two (BUFFERSIZE, e.g. 25 for 32 MiB)",
+        "gemm_multithread_threshold": "Only use multiple threads for GEMM if M, N and K exceed this threshold (GEMM_MULTITHREAD_THRESHOLD)",
+        "thread_timeout": "Number of CPU cycles idle threads spin before sleeping, as a power of two between 4 and 30 (THREAD_TIMEOUT)",
         "dynamic_arch": "Include support for multiple CPU targets, with automatic selection at runtime (x86/x86_64, aarch64 or ppc only)",
+        "dynamic_list": "Comma-separated list of CPU targets to include when dynamic_arch=True (e.g. HASWELL,SKYLAKEX,ZEN)",
+        "small_matrix_opt": "Use dedicated GEMM kernels without packing for small matrices (defaults to True if TARGET is one of the x86_64 or armv8 TARGETs that have them and dynamic_arch=False)",
         "target": "OpenBLAS TARGET variable (see TargetList.txt)",
     }
     short_paths = True
 
+    # Integer build-time parameters, passed to CMake as upper case variables
+    _tuning_options = ("num_threads", "num_parallel", "buffersize", "gemm_multithread_threshold", "thread_timeout")
+
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
@@ -111,6 +254,37 @@ class OpenblasConan(ConanFile):
         if self.options.shared:
             self.options.rm_safe("fPIC")
 
+        # Only the profile's conf is known here, a Fortran compiler injected by
+        # a tool_requires (e.g. tttapa-toolchains) requires no_fortran=False
+        if self.options.no_fortran.value is None:
+            compilers = self.conf.get("tools.build:compiler_executables", default={}, check_type=dict)
+            self.options.no_fortran = not compilers.get("fortran")
+
+        # Cross-compiled binaries should not depend on the toolchain's libgfortran
+        if "shared_libgfortran" in self.options and self.options.shared_libgfortran.value is None:
+            self.options.shared_libgfortran = not cross_building(self)
+
+        # The threading option supersedes the legacy use_thread option. Use
+        # threading=openmp to share the OpenMP runtime of the graph (see the
+        # user.openmp:runtime conf) instead of a separate pthreads pool.
+        if not self.options.threading:
+            if not self.options.use_thread:
+                self.options.threading = "serial"
+            else:
+                self.options.threading = "pthread"
+        self.options.rm_safe("use_thread")
+        if self.options.threading == "serial":
+            self.options.rm_safe("num_threads")
+            self.options.rm_safe("gemm_multithread_threshold")
+            self.options.rm_safe("thread_timeout")
+
+        # Try inferring the target from the compiler flags and toolchain settings
+        if not self.options.target:
+            target = self._profile_openblas_target
+            if target:
+                self.output.info(f'Setting OpenBLAS TARGET={target} based on the profile. Set the "{self.name}/*:target=XXX" option to override.')
+                self.options.target = target
+
         # When cross-compiling, OpenBLAS requires explicitly setting TARGET
         if cross_building(self, skip_x64_x86=True) and not self.options.target:
             # Try inferring the target from settings.arch
@@ -119,17 +293,69 @@ class OpenblasConan(ConanFile):
                 self.output.warning(f'Setting OpenBLAS TARGET={target} based on settings.arch. This may result in suboptimal performance. Set the "{self.name}/*:target=XXX" option to silence this warning.')
                 self.options.target = target
 
+        # Only enable the small matrix kernels by default if they can be used
+        if self.options.small_matrix_opt.value is None:
+            target = str(self.options.target) if self.options.target and not self.options.dynamic_arch else None
+            self.options.small_matrix_opt = target in small_matrix_opt_targets
+
+    @property
+    def _openmp_runtime(self):
+        if self.options.threading != "openmp":
+            return None
+        return self.python_requires["tttapa-conan-utils"].module.openmp_runtime(self)
+
+    def requirements(self):
+        if self._openmp_runtime == "libomp":
+            self.requires(self.python_requires["tttapa-conan-utils"].module.llvm_openmp_requirement(self))
+
     def build_requirements(self):
         self.tool_requires("cmake/[>=3.16 <4.4]")
 
     def validate(self):
+        if self.options.small_matrix_opt and not self._small_matrix_opt_arch:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:small_matrix_opt=True" option is only supported on x86_64, armv8 and ppc64')
+        if self.options.interface64 and self.settings.arch not in ["x86_64", "armv8", "armv8.3", "arm64ec", "ppc64le", "ppc64", "mips64", "riscv64", "sparcv9", "s390x"]:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:interface64=True" option requires a 64-bit architecture')
+        for opt in self._tuning_options:
+            value = self.options.get_safe(opt)
+            if value and (not str(value).isdigit() or int(value) < 1):
+                raise ConanInvalidConfiguration(f'"{self.name}/*:{opt}" option should be a positive integer, not "{value}"')
+        if self._openmp_runtime == "libgomp" and self.settings.compiler != "gcc":
+            raise ConanInvalidConfiguration(f'"{self.name}/*:threading=openmp" with user.openmp:runtime=libgomp requires GCC')
+        if self._openmp_runtime == "libomp" and self.settings.compiler == "gcc" and self.options.shared:
+            # A shared library built with GCC's -fopenmp always depends on libgomp
+            raise ConanInvalidConfiguration(f'"{self.name}/*:threading=openmp" with user.openmp:runtime=libomp requires "{self.name}/*:shared=False" when using GCC')
+        thread_timeout = self.options.get_safe("thread_timeout")
+        if thread_timeout and not 4 <= int(thread_timeout) <= 30:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:thread_timeout" option should be between 4 and 30')
+        if self.options.dynamic_list:
+            if not self.options.dynamic_arch:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:dynamic_list" option requires "{self.name}/*:dynamic_arch=True"')
+            invalid = [t for t in self._dynamic_list if t not in available_openblas_targets]
+            if invalid:
+                raise ConanInvalidConfiguration(f'Invalid OpenBLAS targets in "{self.name}/*:dynamic_list": {", ".join(invalid)}')
+        precisions = ["build_single", "build_double", "build_complex", "build_complex16"]
+        if not any(self.options.get_safe(p) for p in precisions):
+            raise ConanInvalidConfiguration(f'At least one of the "{self.name}/*:build_{{single,double,complex,complex16}}" options should be True')
+        if self.options.build_complex and not self.options.build_single:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:build_complex=True" option requires "{self.name}/*:build_single=True"')
+        if self.options.build_complex16 and not self.options.build_double:
+            raise ConanInvalidConfiguration(f'"{self.name}/*:build_complex16=True" option requires "{self.name}/*:build_double=True"')
         if self.options.build_relapack:
+            if not all(self.options.get_safe(p) for p in precisions):
+                # ReLAPACK unconditionally compiles its s/d/c/z sources
+                raise ConanInvalidConfiguration(f'"{self.name}/*:build_relapack=True" option requires all "{self.name}/*:build_{{single,double,complex,complex16}}" options to be True')
             if not self.options.build_lapack:
                 raise ConanInvalidConfiguration(f'"{self.name}/*:build_relapack=True" option requires "{self.name}/*:build_lapack=True"')
             if self.settings.compiler not in ["gcc", "clang"]:
                 # ld: unknown option: --allow-multiple-definition on apple-clang
                 raise ConanInvalidConfiguration(f'"{self.name}/*:build_relapack=True" option is only supported for GCC and Clang')
 
+    def package_id(self):
+        # Record the OpenMP runtime that the consumers link to
+        if self.info.options.threading == "openmp" and self.conf.get("user.openmp:runtime"):
+            self.info.conf.define("user.openmp:runtime", self.conf.get("user.openmp:runtime"))
+
     def validate_build(self):
         # If we're cross-compiling, and the user didn't provide the target, and
         # we couldn't infer the target from settings.arch, fail
@@ -149,18 +375,36 @@ class OpenblasConan(ConanFile):
         tc.variables["BUILD_TESTING"] = False
 
         tc.variables["NOFORTRAN"] = not self.options.build_lapack
-        # This checks explicit user-specified fortran compiler
         if self.options.build_lapack and self.options.no_fortran:
             tc.variables["C_LAPACK"] = True
             tc.variables["NOFORTRAN"] = True
             self.output.info("Building LAPACK without a Fortran compiler")
+            if self._fortran_compiler:
+                self.output.warning(f'Not using Fortran compiler {self._fortran_compiler}. Set "{self.name}/*:no_fortran=False" to build LAPACK with it.')
+        elif self.options.build_lapack:
+            self.output.info(f"Building LAPACK with Fortran compiler {self._fortran_compiler or '(found by CMake)'}")
+            if self.options.shared and not self.options.get_safe("shared_libgfortran", True):
+                tc.extra_sharedlinkflags.append("-static-libgfortran")
 
         tc.variables["BUILD_WITHOUT_LAPACK"] = not self.options.build_lapack
         tc.variables["BUILD_RELAPACK"] = self.options.build_relapack
+        tc.variables["BUILD_SINGLE"] = self.options.build_single
+        tc.variables["BUILD_DOUBLE"] = self.options.build_double
+        tc.variables["BUILD_COMPLEX"] = self.options.build_complex
+        tc.variables["BUILD_COMPLEX16"] = self.options.build_complex16
+        tc.variables["INTERFACE64"] = self.options.interface64
 
         tc.variables["DYNAMIC_ARCH"] = self.options.dynamic_arch
-        tc.variables["USE_THREAD"] = self.options.use_thread
+        tc.cache_variables["SMALL_MATRIX_OPT"] = bool(self.options.small_matrix_opt)
+        if self.options.dynamic_list:
+            tc.cache_variables["DYNAMIC_LIST"] = ";".join(self._dynamic_list)
+        tc.variables["USE_THREAD"] = self.options.threading != "serial"
+        tc.variables["USE_OPENMP"] = self.options.threading == "openmp"
         tc.variables["USE_LOCKING"] = self.options.use_locking
+        for opt in self._tuning_options:
+            value = self.options.get_safe(opt)
+            if value:
+                tc.variables[opt.upper()] = int(value)
 
         tc.variables["MSVC_STATIC_CRT"] = is_msvc_static_runtime(self)
 
@@ -188,6 +432,53 @@ class OpenblasConan(ConanFile):
         rmdir(self, os.path.join(self.package_folder, "share"))
         fix_apple_shared_install_name(self)
 
+    @property
+    def _fortran_compiler(self):
+        # Including the compilers injected by tool_requires, which are only
+        # available from generate() onwards
+        compilers = self.conf.get("tools.build:compiler_executables", default={}, check_type=dict)
+        return compilers.get("fortran")
+
+    @property
+    def _small_matrix_opt_arch(self):
+        return str(self.settings.arch) in ["x86_64", "armv8", "armv8.3", "arm64ec", "ppc64le", "ppc64"]
+
+    @property
+    def _dynamic_list(self):
+        return [t.strip().upper() for t in str(self.options.dynamic_list).split(",") if t.strip()]
+
+    @property
+    def _profile_openblas_target(self):
+        generic = conan_arch_to_openblas_target.get(str(self.settings.arch))
+        # -mcpu is more specific than -march (and the only option on some ARM compilers)
+        cpu = None
+        for flags in ["tools.build:cflags", "tools.build:cxxflags"]:
+            for flag in self.conf.get(flags, default=[], check_type=list):
+                if flag.startswith("-march=") and not cpu:
+                    cpu = flag.split("=", 1)[1]
+                elif flag.startswith("-mcpu="):
+                    cpu = flag.split("=", 1)[1]
+            if cpu:
+                break
+        if cpu and cpu != "native":
+            cpus = compiler_cpu_to_openblas_target.get(generic, {})
+            # Ignore feature modifiers such as +crypto, except for SVE
+            base, *features = cpu.split("+")
+            if "sve" in features and f"{base}+sve" in cpus:
+                return cpus[f"{base}+sve"]
+            if base in cpus:
+                return cpus[base]
+            self.output.warning(f'Could not infer OpenBLAS TARGET from unknown CPU "{cpu}" in the compiler flags')
+        toolchain_cpu = self.settings.get_safe("arch.toolchain-cpu")
+        toolchain_vendor = self.settings.get_safe("os.toolchain-vendor")
+        if toolchain_cpu or toolchain_vendor:
+            default_cpu = {"armv8": "aarch64", "armv7hf": "armv7", "armv6": "armv6"}
+            default_vendor = {"aarch64": "rpi3", "armv8": "rpi3", "armv7": "neon", "armv6": "rpi"}
+            toolchain_cpu = toolchain_cpu or default_cpu.get(str(self.settings.arch))
+            toolchain_vendor = toolchain_vendor or default_vendor.get(toolchain_cpu)
+            return toolchain_to_openblas_target.get((toolchain_cpu, toolchain_vendor))
+        return None
+
     @property
     def _lib_name(self):
         if self.options.shared and self.settings.build_type == "Debug" and not is_msvc(self):
@@ -198,23 +489,38 @@ class OpenblasConan(ConanFile):
         # CMake config file:
         # - OpenBLAS always has one and only one of these components: openmp, pthread or serial.
         # - Whatever if this component is requested or not, official CMake imported target is always OpenBLAS::OpenBLAS
-        # - TODO: add openmp component when implemented in this recipe
         self.cpp_info.set_property("cmake_file_name", "OpenBLAS")
         self.cpp_info.set_property("cmake_target_name", "OpenBLAS::OpenBLAS")
         self.cpp_info.set_property("pkg_config_name", "openblas")
         # 'pthread' causes issues without namespace
-        cmake_component_name = "pthread" if self.options.use_thread else "serial"  # TODO: how to model this in CMakeDeps?
+        cmake_component_name = str(self.options.threading)  # TODO: how to model this in CMakeDeps?
         self.cpp_info.components["openblas_component"].set_property("cmake_target_name", f"OpenBLAS::{cmake_component_name}")
         self.cpp_info.components["openblas_component"].set_property("pkg_config_name", "openblas")
         self.cpp_info.components["openblas_component"].includedirs.append(os.path.join("include", "openblas"))
         self.cpp_info.components["openblas_component"].libs = [self._lib_name]
         if self.settings.os in ["Linux", "FreeBSD"]:
             self.cpp_info.components["openblas_component"].system_libs.append("m")
-            if self.options.use_thread:
+            if self.options.threading != "serial":
                 self.cpp_info.components["openblas_component"].system_libs.append("pthread")
             if self.options.build_lapack and not self.options.no_fortran:
-                libfortran = "gfortran" if self.options.shared_libgfortran else ":libgfortran.a"
-                self.cpp_info.components["openblas_component"].system_libs.append(libfortran)
+                if self.options.shared_libgfortran:
+                    self.cpp_info.components["openblas_component"].system_libs.append("gfortran")
+                elif not self.options.shared:
+                    self.cpp_info.components["openblas_component"].system_libs.append(":libgfortran.a")
+                    if self.settings.arch in ["x86", "x86_64"]:
+                        self.cpp_info.components["openblas_component"].system_libs.append(":libquadmath.a")
+        if self._openmp_runtime == "libomp":
+            self.cpp_info.components["openblas_component"].requires.append("llvm-openmp::llvm-openmp")
+        elif self._openmp_runtime == "libgomp":
+            self.cpp_info.components["openblas_component"].sharedlinkflags.append("-fopenmp")
+            self.cpp_info.components["openblas_component"].exelinkflags.append("-fopenmp")
+
+        # Thread budget shared by all packages in the graph
+        if self.options.threading == "openmp":
+            self.python_requires["tttapa-conan-utils"].module.define_openmp_thread_budget(self)
+        threads = self.conf.get("user.threads:budget", check_type=int)
+        if threads and self.options.threading != "serial":
+            self.runenv_info.define("OPENBLAS_NUM_THREADS", str(threads))
 
         self.buildenv_info.define_path("OpenBLAS_HOME", self.package_folder)
         self.runenv_info.define_path("OpenBLAS_HOME", self.package_folder)
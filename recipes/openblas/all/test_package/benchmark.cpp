@@ -0,0 +1,186 @@
+#include <cblas.h>
+#ifdef OPENBLAS_BENCHMARK_LAPACK
+#include <lapacke.h>
+#endif
+
+#include <algorithm>
+#include <chrono>
+#include <cstdlib>
+#include <fstream>
+#include <functional>
+#include <iostream>
+#include <random>
+#include <string>
+#include <vector>
+
+// Usage: benchmark <output.json> <target> <dynamic_arch> [max_threads] [sizes...]
+
+namespace {
+
+using clk = std::chrono::steady_clock;
+
+struct Result {
+    std::string routine;
+    int n;
+    int threads;
+    int reps;
+    double ms;
+    double gflops;
+};
+
+struct Problem {
+    int n;
+    std::vector<double> A, B, C, x, y;
+    std::vector<double> A0, B0; // Pristine copies for in-place routines
+};
+
+Problem make_problem(int n) {
+    std::mt19937 rng{12345};
+    std::uniform_real_distribution<double> dist{-1, 1};
+    Problem p;
+    p.n = n;
+    auto nn = static_cast<size_t>(n) * n;
+    for (auto *v : {&p.A, &p.B, &p.C})
+        v->resize(nn);
+    p.x.resize(n);
+    p.y.resize(n);
+    for (auto *v : {&p.B, &p.C, &p.x, &p.y})
+        std::generate(v->begin(), v->end(), [&] { return dist(rng); });
+    // Symmetric positive definite and well-conditioned triangular matrix A
+    std::generate(p.A.begin(), p.A.end(), [&] { return dist(rng); });
+    for (int j = 0; j < n; ++j)
+        for (int i = 0; i < j; ++i)
+            p.A[i + j * n] = p.A[j + i * n];
+    for (int i = 0; i < n; ++i)
+        p.A[i + i * n] += n;
+    p.A0 = p.A;
+    p.B0 = p.B;
+    return p;
+}
+
+// Runs the setup (untimed) and the kernel (timed) until the time budget is
+// exhausted, returns the best time of a single repetition in seconds. The
+// time is at least one clock tick, so that the GFLOP/s are always finite.
+double time_kernel(const std::function<void()> &setup, const std::function<void()> &kernel,
+                   int &reps) {
+    using namespace std::chrono_literals;
+    const auto budget = 200ms;
+    const int min_reps = 3, max_reps = 10000;
+    auto best = clk::duration::max(), total = clk::duration::zero();
+    setup();
+    kernel(); // warm-up
+    for (reps = 0; reps < max_reps && (reps < min_reps || total < budget); ++reps) {
+        setup();
+        auto t0 = clk::now();
+        kernel();
+        auto t1 = clk::now();
+        best = std::min(best, t1 - t0);
+        total += t1 - t0;
+    }
+    best = std::max(best, clk::duration{1});
+    return std::chrono::duration<double>(best).count();
+}
+
+void benchmark_size(int n, int threads, std::vector<Result> &results) {
+    auto p = make_problem(n);
+    auto *A = p.A.data(), *B = p.B.data(), *C = p.C.data();
+    auto restore_B = [&] { std::copy(p.B0.begin(), p.B0.end(), p.B.begin()); };
+    auto nop = [] {};
+    const double n3 = double(n) * n * n, n2 = double(n) * n;
+    auto run = [&](const char *routine, double flops, const std::function<void()> &setup,
+                   const std::function<void()> &kernel) {
+        int reps = 0;
+        double t = time_kernel(setup, kernel, reps);
+        results.push_back({routine, n, threads, reps, t * 1e3, flops / t * 1e-9});
+        std::cout << routine << "\tn=" << n << "\tthreads=" << threads << "\t" << t * 1e3
+                  << " ms\t" << results.back().gflops << " GFLOPS" << std::endl;
+    };
+    run("dgemm", 2 * n3, nop, [&] {
+        cblas_dgemm(CblasColMajor, CblasNoTrans, CblasNoTrans, n, n, n, 1, A, n, B, n, 0, C,
+                    n);
+    });
+    run("dgemv", 2 * n2, nop, [&] {
+        cblas_dgemv(CblasColMajor, CblasNoTrans, n, n, 1, A, n, p.x.data(), 1, 0, p.y.data(), 1);
+    });
+    run("dsyrk", n3, nop, [&] {
+        cblas_dsyrk(CblasColMajor, CblasLower, CblasNoTrans, n, n, 1, B, n, 0, C, n);
+    });
+    run("dtrsm", n3, restore_B, [&] {
+        cblas_dtrsm(CblasColMajor, CblasLeft, CblasLower, CblasNoTrans, CblasNonUnit, n, n, 1, A,
+                    n, B, n);
+    });
+#ifdef OPENBLAS_BENCHMARK_LAPACK
+    auto restore_A = [&] { std::copy(p.A0.begin(), p.A0.end(), p.A.begin()); };
+    run("dpotrf", n3 / 3, restore_A,
+        [&] { LAPACKE_dpotrf_work(LAPACK_COL_MAJOR, 'L', n, A, n); });
+#endif
+}
+
+std::string json_escape(const std::string &s) {
+    std::string r;
+    for (char c : s) {
+        if (c == '"' || c == '\\')
+            r += '\\';
+        r += c;
+    }
+    return r;
+}
+
+} // namespace
+
+int main(int argc, char *argv[]) {
+    if (argc < 4) {
+        std::cerr << "Usage: " << argv[0]
+                  << " <output.json> <target> <dynamic_arch> [max_threads] [sizes...]\n";
+        return 1;
+    }
+    const std::string output = argv[1], target = argv[2];
+    const bool dynamic_arch = std::string(argv[3]) == "True";
+    const int num_procs = openblas_get_num_procs();
+    int max_threads = argc > 4 ? std::atoi(argv[4]) : 0;
+    if (max_threads <= 0)
+        max_threads = num_procs;
+    if (openblas_get_parallel() == 0) // sequential build
+        max_threads = 1;
+    std::vector<int> sizes;
+    for (int i = 5; i < argc; ++i)
+        sizes.push_back(std::atoi(argv[i]));
+    if (sizes.empty())
+        sizes = {16, 32, 64, 128, 256, 512, 1024};
+
+    // Powers of two up to and including max_threads
+    std::vector<int> thread_counts;
+    for (int t = 1; t < max_threads; t *= 2)
+        thread_counts.push_back(t);
+    thread_counts.push_back(max_threads);
+
+    std::cout << openblas_get_config() << " (" << openblas_get_corename() << ")" << std::endl;
+    std::vector<Result> results;
+    for (int threads : thread_counts) {
+        openblas_set_num_threads(threads);
+        for (int n : sizes)
+            benchmark_size(n, threads, results);
+    }
+
+    std::ofstream f{output};
+    f << "{\n"
+      << "  \"config\": \"" << json_escape(openblas_get_config()) << "\",\n"
+      << "  \"corename\": \"" << json_escape(openblas_get_corename()) << "\",\n"
+      << "  \"target\": \"" << json_escape(target) << "\",\n"
+      << "  \"dynamic_arch\": " << (dynamic_arch ? "true" : "false") << ",\n"
+      << "  \"parallel\": " << openblas_get_parallel() << ",\n"
+      << "  \"num_procs\": " << num_procs << ",\n"
+      << "  \"results\": [\n";
+    for (size_t i = 0; i < results.size(); ++i) {
+        const auto &r = results[i];
+        f << "    {\"routine\": \"" << r.routine << "\", \"n\": " << r.n
+          << ", \"threads\": " << r.threads << ", \"reps\": " << r.reps << ", \"ms\": " << r.ms
+          << ", \"gflops\": " << r.gflops << "}" << (i + 1 < results.size() ? "," : "") << "\n";
+    }
+    f << "  ]\n}\n";
+    if (!f) {
+        std::cerr << "Failed to write " << output << "\n";
+        return 1;
+    }
+    std::cout << "Benchmark results written to " << output << std::endl;
+}
@@ -1,7 +1,12 @@
 from conan import ConanFile
 from conan.tools.build import can_run
 from conan.tools.cmake import cmake_layout, CMake
+from conan.tools.files import mkdir
+from io import StringIO
+import glob
 import os
+import shlex
+import shutil
 
 
 # It will become the standard on Conan 2.x
@@ -16,12 +21,78 @@ class TestPackageConan(ConanFile):
     def layout(self):
         cmake_layout(self)
 
+    @property
+    def _benchmark(self):
+        if not self.conf.get("user.openblas:benchmark", default=False, check_type=bool):
+            return False
+        if not self.dependencies[self.tested_reference_str].options.build_double:
+            self.output.warning("Skipping OpenBLAS benchmark: it requires build_double=True")
+            return False
+        return True
+
     def build(self):
+        openblas = self.dependencies[self.tested_reference_str]
+        variables = {
+            "OPENBLAS_BENCHMARK": self._benchmark,
+            "OPENBLAS_TEST_SINGLE": not openblas.options.build_double,
+        }
+        if self._benchmark:
+            variables["OPENBLAS_BENCHMARK_LAPACK"] = bool(openblas.options.build_lapack)
         cmake = CMake(self)
-        cmake.configure()
+        cmake.configure(variables=variables)
         cmake.build()
 
     def test(self):
         if can_run(self):
+            self._check_small_matrix_opt()
             bin_path = os.path.join(self.cpp.build.bindir, "test_package")
             self.run(bin_path, env="conanrun")
+            if self._benchmark:
+                self._run_benchmark()
+
+    def _check_small_matrix_opt(self):
+        # Verify that the small matrix GEMM kernels were compiled in (uses the
+        # build machine's nm, so only when not cross-building)
+        openblas = self.dependencies[self.tested_reference_str]
+        if not openblas.options.get_safe("small_matrix_opt") or not shutil.which("nm"):
+            return
+        if self.settings.os not in ("Linux", "Macos"):
+            return
+        if not openblas.options.shared:
+            ext = "a"
+        else:
+            ext = "dylib" if self.settings.os == "Macos" else "so"
+        libdirs = openblas.cpp_info.aggregated_components().libdirs
+        libs = sorted(lib for d in libdirs for lib in glob.glob(os.path.join(d, f"libopenblas*.{ext}")))
+        assert libs, f"OpenBLAS library (*.{ext}) not found in {libdirs}"
+        # Shared libraries on Linux may be stripped, use the dynamic symbol table
+        nm_args = "-D" if ext == "so" else ""
+        self.run(f"nm {nm_args} {shlex.quote(libs[0])}", output := StringIO())
+        assert "gemm_small_kernel" in output.getvalue(), "OpenBLAS was built without SMALL_MATRIX_OPT kernels"
+        self.output.info("OpenBLAS small matrix GEMM kernels found")
+
+    @property
+    def _benchmark_output_dir(self):
+        output_dir = self.conf.get("user.openblas:benchmark_output_dir", check_type=str)
+        if not output_dir:
+            self.output.warning("Writing the OpenBLAS benchmark results to the test_package build folder, which is "
+                                "removed by the next conan test or create. Set user.openblas:benchmark_output_dir to keep them.")
+            return self.build_folder
+        output_dir = os.path.abspath(output_dir)
+        mkdir(self, output_dir)
+        return output_dir
+
+    def _run_benchmark(self):
+        openblas = self.dependencies[self.tested_reference_str]
+        output = os.path.join(self._benchmark_output_dir, "openblas-benchmark.json")
+        max_threads = self.conf.get("user.openblas:benchmark_max_threads", default=0, check_type=int)
+        sizes = self.conf.get("user.openblas:benchmark_sizes", default=[], check_type=list)
+        args = [
+            os.path.join(self.cpp.build.bindir, "benchmark"),
+            output,
+            str(openblas.options.get_safe("target") or "native"),
+            str(openblas.options.dynamic_arch),
+            str(max_threads),
+        ] + [str(n) for n in sizes]
+        self.run(" ".join(shlex.quote(a) for a in args), env="conanrun")
+        self.output.info(f"OpenBLAS benchmark results: {output}")
@@ -1,15 +1,24 @@
 #include <cblas.h>
 #include <stdio.h>
 
+// Only the single precision routines are available with build_double=False
+#ifdef OPENBLAS_TEST_SINGLE
+typedef float real_t;
+#define cblas_gemm cblas_sgemm
+#else
+typedef double real_t;
+#define cblas_gemm cblas_dgemm
+#endif
+
 int main()
 {
   int i=0;
-  double A[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
-  double B[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
-  double C[9] = {.5,.5,.5,.5,.5,.5,.5,.5,.5};
-  cblas_dgemm(CblasColMajor, CblasNoTrans, CblasTrans,3,3,2,1,A, 3, B, 3,2,C,3);
+  real_t A[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
+  real_t B[6] = {1.0,2.0,1.0,-3.0,4.0,-1.0};
+  real_t C[9] = {.5,.5,.5,.5,.5,.5,.5,.5,.5};
+  cblas_gemm(CblasColMajor, CblasNoTrans, CblasTrans,3,3,2,1,A, 3, B, 3,2,C,3);
 
   for(i=0; i<9; i++)
-    printf("%lf ", C[i]);
+    printf("%lf ", (double)C[i]);
   printf("\n");
 }
@@ -31,14 +31,19 @@ class QPALMRecipe(ConanFile):
         "with_examples": False,
         "with_mex": False,
     }
+    # Options that are forwarded to LADEL
+    ladel_options = {
+        "with_amd": True,
+        "long_index": True,  # affects ABI
+    }
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
-    } | {k: [True, False] for k in bool_qpalm_options}
+    } | {k: [True, False] for k in bool_qpalm_options | ladel_options}
     default_options = {
         "shared": False,
         "fPIC": True,
-    } | bool_qpalm_options
+    } | bool_qpalm_options | ladel_options
 
     def config_options(self):
         if self.settings.os == "Windows":
@@ -48,10 +53,20 @@ class QPALMRecipe(ConanFile):
         if self.options.with_python and not self.options.with_cxx:
             msg = "Python interface requires C++. Set 'with_cxx=True'."
             raise ConanInvalidConfiguration(msg)
+        ladel = self.dependencies["ladel"]
+        for k in self.ladel_options:
+            value = self.options.get_safe(k)
+            if ladel.options.get_safe(k) != value:
+                msg = f'"{self.name}/*:{k}={value}" option requires "ladel/*:{k}={value}"'
+                raise ConanInvalidConfiguration(msg)
 
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if self.options.get_safe("with_mex"):
+            self.options["ladel/*"].with_mex = True
+        for k in self.ladel_options:
+            setattr(self.options["ladel/*"], k, getattr(self.options, k))
 
     def export_sources(self):
         export_conandata_patches(self)
@@ -82,10 +97,6 @@ class QPALMRecipe(ConanFile):
         else:
             self.tool_requires("cmake/[>=4.1 <5]")
 
-    def configure(self):
-        if self.options.get_safe("with_mex"):
-            self.options["ladel/*"].with_mex = True
-
     def generate(self):
         deps = CMakeDeps(self)
         deps.generate()
@@ -1,20 +1,52 @@
+import glob
+import json
 import os
+import re
+import shlex
+from io import StringIO
 
 from conan import ConanFile
+from conan.errors import ConanException
 from conan.tools.cmake import CMake, cmake_layout
 from conan.tools.build import can_run
+from conan.tools.files import save
+
+from maros_meszaros import read_problem, write_problem
 
 
 class QPALMTestConan(ConanFile):
     settings = "os", "compiler", "build_type", "arch"
     generators = "CMakeDeps", "CMakeToolchain"
 
+    @property
+    def _benchmark(self):
+        return self.conf.get("user.qpalm:benchmark", default=False, check_type=bool)
+
+    @property
+    def _count_factorizations(self):
+        # The LADEL functions can only be wrapped when they are linked
+        # statically into the benchmark runner, using GNU ld's --wrap
+        qpalm = self.dependencies[self.tested_reference_str]
+        ladel = self.dependencies["ladel"]
+        return (
+            self.settings.os == "Linux"
+            and not qpalm.options.shared
+            and not ladel.options.shared
+        )
+
     def requirements(self):
         self.requires(self.tested_reference_str)
 
     def build(self):
+        ladel = self.dependencies["ladel"]
+        variables = {
+            "LADEL_LONG_INDEX": bool(ladel.options.long_index),
+            "QPALM_BENCHMARK": self._benchmark,
+        }
+        if self._benchmark:
+            variables["QPALM_BENCHMARK_COUNT_FACTORIZATIONS"] = self._count_factorizations
         cmake = CMake(self)
-        cmake.configure()
+        cmake.configure(variables=variables)
         cmake.build()
 
     def layout(self):
@@ -24,3 +56,67 @@ class QPALMTestConan(ConanFile):
         if can_run(self):
             cmd = os.path.join(self.cpp.build.bindir, "example")
             self.run(cmd, env="conanrun")
+            if self._benchmark:
+                self._run_benchmarks()
+
+    @property
+    def _benchmark_output_dir(self):
+        output_dir = self.conf.get("user.qpalm:benchmark_output_dir", check_type=str)
+        if not output_dir:
+            self.output.warning("Writing the qpalm benchmark results to the test_package build folder, which is "
+                                "removed by the next conan test or create. Set user.qpalm:benchmark_output_dir to keep them.")
+            return self.build_folder
+        return os.path.abspath(output_dir)
+
+    def _run_benchmarks(self):
+        qpalm = self.dependencies[self.tested_reference_str]
+        ladel = self.dependencies["ladel"]
+        problem_dir = self.conf.get("user.qpalm:benchmark_dir", check_type=str)
+        if not problem_dir or not os.path.isdir(problem_dir):
+            raise ConanException(
+                "user.qpalm:benchmark requires user.qpalm:benchmark_dir to point "
+                "to a directory of Maros-Meszaros .qps or .mat files"
+            )
+        benchmark_filter = self.conf.get("user.qpalm:benchmark_filter", default=None, check_type=str)
+        time_limit = self.conf.get("user.qpalm:benchmark_time_limit", default=None, check_type=str)
+        # Record the configuration in the context of the JSON output
+        context = {
+            "qpalm_version": str(qpalm.ref.version),
+            "ladel_version": str(ladel.ref.version),
+            "build_type": str(self.settings.build_type),
+            "compiler": f"{self.settings.compiler} {self.settings.compiler.version}",
+            "arch": str(self.settings.arch),
+            "cflags": " ".join(self.conf.get("tools.build:cflags", default=[], check_type=list)),
+            "shared": bool(qpalm.options.shared),
+            "with_amd": bool(ladel.options.with_amd),
+            "long_index": bool(ladel.options.long_index),
+            "count_factorizations": self._count_factorizations,
+        }
+        # Deduplicated for case-insensitive file systems
+        files = sorted({
+            f for ext in ("qps", "QPS", "mat") for f in glob.glob(os.path.join(problem_dir, f"*.{ext}"))
+        })
+        exe = os.path.join(self.cpp.build.bindir, "qpalm_benchmark")
+        problems = []
+        for path in files:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if benchmark_filter and not re.search(benchmark_filter, name):
+                continue
+            # Each problem is solved in a separate process, so that the peak
+            # RSS is that of a single problem
+            converted = os.path.join(self.build_folder, "problems", f"{name}.txt")
+            try:
+                os.makedirs(os.path.dirname(converted), exist_ok=True)
+                write_problem(read_problem(path), converted)
+                args = [exe, converted] + ([time_limit] if time_limit else [])
+                self.run(" ".join(shlex.quote(a) for a in args), stdout=(output := StringIO()), env="conanrun")
+                result = json.loads(output.getvalue())
+            except (ValueError, OSError, ConanException) as e:
+                self.output.warning(f"qpalm benchmark {name} failed: {e}")
+                result = {"error": str(e)}
+            problems.append({"name": name} | result)
+        if not problems:
+            self.output.warning(f"No Maros-Meszaros problems found in {problem_dir}")
+        result = os.path.join(self._benchmark_output_dir, f"qpalm-{qpalm.ref.version}-maros-meszaros.json")
+        save(self, result, json.dumps({"context": context, "problems": problems}, indent=2))
+        self.output.info(f"qpalm benchmark results: {result}")
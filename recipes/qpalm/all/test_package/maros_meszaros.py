@@ -0,0 +1,343 @@
+"""Readers for the Maros-Meszaros QP test set in .qps and .mat format.
+
+Problems are returned in the form used by QPALM:
+
+    minimize    ½ xᵀQx + qᵀx + c
+    subject to  bmin ≤ Ax ≤ bmax
+
+with Q (upper triangle only) and A in compressed sparse column format.
+The bounds on the variables of .qps files are appended to A as identity
+rows, as in the .mat files of the OSQP and qpbenchmark conversions.
+"""
+
+import math
+import os
+import struct
+import zlib
+
+# QPALM_INFTY
+INF = 1e20
+
+
+def _clip(value):
+    return max(-INF, min(INF, value))
+
+
+def _csc(ncol, entries):
+    """Convert a dict {(row, col): value} to column pointers, row indices and values."""
+    columns = [[] for _ in range(ncol)]
+    for (row, col), value in entries.items():
+        columns[col].append((row, value))
+    p, i, x = [0], [], []
+    for column in columns:
+        for row, value in sorted(column):
+            i.append(row)
+            x.append(value)
+        p.append(len(i))
+    return p, i, x
+
+
+def read_qps(path):
+    obj, rows, row_types, cols, free_rows = None, {}, [], {}, set()
+    q, A, Q, rhs, ranges = {}, {}, {}, {}, {}
+    lower, upper, c = {}, {}, 0.0
+    section = None
+
+    def malformed():
+        return ValueError(f"{path}:{lineno}: malformed {section} line: {line.strip()}")
+
+    def column(name):
+        if name not in cols:
+            raise ValueError(f"{path}:{lineno}: unknown column {name}")
+        return cols[name]
+
+    def row_index(name):
+        if name not in rows and name != obj and name not in free_rows:
+            raise ValueError(f"{path}:{lineno}: unknown row {name}")
+        return rows.get(name)
+
+    def number(word):
+        try:
+            return float(word)
+        except ValueError:
+            raise ValueError(f"{path}:{lineno}: invalid number {word}") from None
+
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            words = line.split()
+            if not words or line.startswith("*"):
+                continue
+            if not line[0].isspace():
+                section = words[0].upper()
+                if section == "OBJSENSE" and words[1:] and words[1].upper().startswith("MAX"):
+                    raise ValueError(f"{path}: maximization problems are not supported")
+                continue
+            if section == "ROWS":
+                if len(words) != 2:
+                    raise malformed()
+                kind, name = words[0].upper(), words[1]
+                if kind == "N":
+                    if obj is None:
+                        obj = name
+                    else:
+                        free_rows.add(name)  # Other free rows are ignored
+                elif kind in ("E", "L", "G"):
+                    rows[name] = len(row_types)
+                    row_types.append(kind)
+                else:
+                    raise ValueError(f"{path}:{lineno}: unsupported row type {kind}")
+            elif section == "COLUMNS":
+                if "'MARKER'" in words:
+                    continue
+                if len(words) not in (3, 5):
+                    raise malformed()
+                col = cols.setdefault(words[0], len(cols))
+                for name, value in zip(words[1::2], words[2::2]):
+                    if name == obj:
+                        q[col] = number(value)
+                    elif row_index(name) is not None:
+                        A[rows[name], col] = number(value)
+            elif section in ("RHS", "RANGES"):
+                # The name of the RHS or RANGES vector is optional
+                if len(words) not in (2, 3, 4, 5):
+                    raise malformed()
+                pairs = words[1:] if len(words) % 2 else words
+                for name, value in zip(pairs[0::2], pairs[1::2]):
+                    if name == obj and section == "RHS":
+                        c = -number(value)
+                    elif row_index(name) is not None:
+                        (rhs if section == "RHS" else ranges)[rows[name]] = number(value)
+            elif section == "BOUNDS":
+                # type [bound name] column [value], the value of a BV bound
+                # is optional and ignored
+                kind = words[0].upper()
+                if kind not in ("UP", "LO", "FX", "FR", "MI", "PL", "BV"):
+                    raise ValueError(f"{path}:{lineno}: unsupported bound type {kind}")
+                has_value = kind not in ("FR", "MI", "PL") and not (kind == "BV" and len(words) < 4)
+                if len(words) - has_value not in (2, 3):
+                    raise malformed()
+                col = column(words[len(words) - 1 - has_value])
+                value = number(words[-1]) if has_value else None
+                if kind == "UP":
+                    upper[col] = value
+                    if value < 0 and col not in lower:
+                        lower[col] = -INF
+                elif kind == "LO":
+                    lower[col] = value
+                elif kind == "FX":
+                    lower[col] = upper[col] = value
+                elif kind == "FR":
+                    lower[col], upper[col] = -INF, INF
+                elif kind == "MI":
+                    lower[col] = -INF
+                elif kind == "PL":
+                    upper[col] = INF
+                else:
+                    lower[col], upper[col] = 0.0, 1.0
+            elif section in ("QUADOBJ", "QSECTION", "QMATRIX"):
+                if len(words) != 3:
+                    raise malformed()
+                i, j, value = column(words[0]), column(words[1]), number(words[2])
+                # QUADOBJ lists one triangle, QMATRIX lists both
+                if section != "QMATRIX" or i <= j:
+                    key = (min(i, j), max(i, j))
+                    Q[key] = Q.get(key, 0.0) + value
+            elif section == "OBJSENSE":
+                if words[0].upper().startswith("MAX"):
+                    raise ValueError(f"{path}: maximization problems are not supported")
+            elif section == "ENDATA":
+                break
+            else:
+                raise ValueError(f"{path}: unsupported section {section}")
+
+    n, m_rows = len(cols), len(row_types)
+    bmin, bmax = [], []
+    for row, kind in enumerate(row_types):
+        b, r = rhs.get(row, 0.0), ranges.get(row)
+        lo, up = {"E": (b, b), "L": (-INF, b), "G": (b, INF)}[kind]
+        if r is not None:
+            if kind == "L" or (kind == "E" and r < 0):
+                lo = b - abs(r)
+            else:
+                up = b + abs(r)
+        bmin.append(lo)
+        bmax.append(up)
+    for col in range(n):
+        A[m_rows + col, col] = 1.0
+        bmin.append(lower.get(col, 0.0))
+        bmax.append(upper.get(col, INF))
+    return {
+        "n": n,
+        "m": m_rows + n,
+        "c": c,
+        "Q": _csc(n, Q),
+        "q": [q.get(col, 0.0) for col in range(n)],
+        "A": _csc(n, A),
+        "bmin": [_clip(b) for b in bmin],
+        "bmax": [_clip(b) for b in bmax],
+    }
+
+
+# MAT-file level 5 data types and the corresponding struct formats
+_mat_types = {1: "b", 2: "B", 3: "h", 4: "H", 5: "i", 6: "I", 7: "f", 9: "d", 12: "q", 13: "Q"}
+_mi_matrix, _mi_compressed = 14, 15
+_mx_cell, _mx_struct, _mx_char, _mx_sparse = 1, 2, 4, 5
+
+
+def _mat_elements(data, endian):
+    """Yield the (type, data) of all data elements in data."""
+    pos = 0
+    while pos + 8 <= len(data):
+        kind, nbytes = struct.unpack_from(endian + "II", data, pos)
+        if kind >> 16:  # Small data element format
+            kind, nbytes = kind & 0xFFFF, kind >> 16
+            yield kind, data[pos + 4 : pos + 4 + nbytes]
+            pos += 8
+        else:
+            yield kind, data[pos + 8 : pos + 8 + nbytes]
+            pos += 8 + nbytes
+            if kind != _mi_compressed:
+                pos += -nbytes % 8
+
+
+def _mat_numbers(kind, data, endian):
+    fmt = _mat_types[kind]
+    return struct.unpack(f"{endian}{len(data) // struct.calcsize(fmt)}{fmt}", data)
+
+
+def _mat_matrix(data, endian):
+    """Return the name and value of a miMATRIX element. Sparse matrices are
+    returned as (rows, cols, column pointers, row indices, values), numeric
+    arrays as (rows, cols, column-major values)."""
+    elements = _mat_elements(data, endian)
+    flags = _mat_numbers(*next(elements), endian)
+    dims = _mat_numbers(*next(elements), endian)
+    name = next(elements)[1].decode("ascii")
+    mx_class = flags[0] & 0xFF
+    if mx_class == _mx_sparse:
+        ir = _mat_numbers(*next(elements), endian)
+        jc = _mat_numbers(*next(elements), endian)
+        pr = _mat_numbers(*next(elements), endian)
+        nnz = jc[-1]
+        if len(dims) != 2 or len(jc) != dims[1] + 1 or any(a > b for a, b in zip(jc, jc[1:])):
+            raise ValueError(f"invalid column pointers of sparse matrix {name}")
+        if jc[0] != 0 or len(ir) < nnz or len(pr) < nnz or any(not 0 <= i < dims[0] for i in ir[:nnz]):
+            raise ValueError(f"invalid row indices of sparse matrix {name}")
+        return name, (dims[0], dims[1], list(jc), list(ir[:nnz]), [float(v) for v in pr[:nnz]])
+    if mx_class == _mx_struct:
+        field_len = _mat_numbers(*next(elements), endian)[0]
+        names = next(elements)[1]
+        fields = [names[k : k + field_len].rstrip(b"\0").decode("ascii") for k in range(0, len(names), field_len)]
+        if math.prod(dims) != 1:
+            return name, None
+        values = [_mat_matrix(value, endian)[1] if value else None for _, value in elements]
+        return name, dict(zip(fields, values))
+    if mx_class in (_mx_cell, _mx_char):
+        return name, None
+    real = _mat_numbers(*next(elements), endian)
+    if len(real) != math.prod(dims):
+        raise ValueError(f"size of array {name} does not match its dimensions")
+    return name, (dims[0], math.prod(dims[1:]), [float(v) for v in real])
+
+
+def _mat_variables(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:19] == b"MATLAB 7.3 MAT-file":
+        raise ValueError(f"{path}: MAT-file version 7.3 (HDF5) is not supported, save it with -v7")
+    endian = {b"IM": "<", b"MI": ">"}.get(data[126:128])
+    if endian is None:
+        raise ValueError(f"{path}: not a MAT-file (level 5)")
+    variables = {}
+    try:
+        for kind, element in _mat_elements(data[128:], endian):
+            if kind == _mi_compressed:
+                kind, element = next(_mat_elements(zlib.decompress(element), endian))
+            if kind == _mi_matrix and element:
+                name, value = _mat_matrix(element, endian)
+                variables[name] = value
+    except (ValueError, TypeError, KeyError, IndexError, StopIteration, struct.error, zlib.error) as e:
+        raise ValueError(f"{path}: malformed MAT-file ({type(e).__name__}: {e})") from None
+    return variables
+
+
+def _mat_sparse(value, upper=False):
+    """Convert a sparse or dense MAT array to CSC, optionally keeping only the upper triangle."""
+    if len(value) == 5:
+        nrow, ncol, jc, ir, pr = value
+        entries = {(ir[k], col): pr[k] for col in range(ncol) for k in range(jc[col], jc[col + 1])}
+    else:
+        nrow, ncol, values = value
+        entries = {(k % nrow, k // nrow): v for k, v in enumerate(values) if v != 0}
+    if upper:
+        entries = {(row, col): v for (row, col), v in entries.items() if row <= col}
+    return nrow, ncol, _csc(ncol, entries)
+
+
+def _mat_vector(value):
+    if len(value) == 5:
+        nrow, ncol, jc, ir, pr = value
+        dense = [0.0] * (nrow * ncol)
+        for col in range(ncol):
+            for k in range(jc[col], jc[col + 1]):
+                dense[col * nrow + ir[k]] = pr[k]
+        return dense
+    return value[2]
+
+
+def read_mat(path):
+    variables = _mat_variables(path)
+    # Some conversions store the problem in a struct
+    if "P" not in variables and "Q" not in variables:
+        structs = [v for v in variables.values() if isinstance(v, dict)]
+        variables = structs[0] if len(structs) == 1 else variables
+    hessian = variables.get("P") or variables.get("Q")
+    if not all(isinstance(v, tuple) for v in (hessian, *(variables.get(k) for k in ("q", "A", "l", "u")))):
+        raise ValueError(f"{path}: expected the numeric variables P, q, A, l and u")
+    r = variables.get("r")
+    try:
+        n, _, Q = _mat_sparse(hessian, upper=True)
+        m, n_A, A = _mat_sparse(variables["A"])
+        q, l, u = (_mat_vector(variables[k]) for k in ("q", "l", "u"))
+        c = _mat_vector(r)[0] if isinstance(r, tuple) else 0.0
+    except IndexError:
+        raise ValueError(f"{path}: malformed sparse matrix or vector") from None
+    if n_A != n:
+        raise ValueError(f"{path}: P is {n}×{n} but A has {n_A} columns")
+    if len(q) != n or len(l) != m or len(u) != m:
+        raise ValueError(f"{path}: expected q of length {n} and l, u of length {m}")
+    return {
+        "n": n,
+        "m": m,
+        "c": c,
+        "Q": Q,
+        "q": q,
+        "A": A,
+        "bmin": [_clip(b) for b in l],
+        "bmax": [_clip(b) for b in u],
+    }
+
+
+def read_problem(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".qps":
+        return read_qps(path)
+    if ext == ".mat":
+        return read_mat(path)
+    raise ValueError(f"{path}: unsupported file type")
+
+
+def write_problem(problem, path):
+    """Write the problem in the plain text format read by src/benchmark.c."""
+
+    def line(values):
+        return " ".join(repr(v) for v in values) + "\n"
+
+    with open(path, "w") as f:
+        f.write(f"{problem['n']} {problem['m']}\n")
+        f.write(line([problem["c"]]))
+        for matrix, vector in [("Q", "q"), ("A", "bmin"), (None, "bmax")]:
+            if matrix:
+                p, i, x = problem[matrix]
+                f.write(f"{len(i)}\n" + line(p) + line(i) + line(x))
+            f.write(line(problem[vector]))
@@ -0,0 +1,255 @@
+// Solves a single QP written by maros_meszaros.py, first from scratch (cold
+// start) and then after a small perturbation of q, starting from the previous
+// solution (warm start). The results are printed to stdout as JSON.
+
+#include <qpalm.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+#if defined(_WIN32)
+#include <windows.h>
+#include <psapi.h>
+#else
+#include <sys/resource.h>
+#endif
+
+#define TRUE 1
+#define FALSE 0
+
+#ifdef QPALM_BENCHMARK_COUNT_FACTORIZATIONS
+// The LADEL factorization and update routines called by QPALM are wrapped
+// using the linker's --wrap option (see CMakeLists.txt)
+static long factorizations = 0, updates = 0;
+
+ladel_int __real_ladel_factorize(ladel_sparse_matrix *M, ladel_symbolics *sym, ladel_int ordering_method,
+                                 ladel_factor **LD, ladel_work *work);
+ladel_int __wrap_ladel_factorize(ladel_sparse_matrix *M, ladel_symbolics *sym, ladel_int ordering_method,
+                                 ladel_factor **LD, ladel_work *work) {
+    ++factorizations;
+    return __real_ladel_factorize(M, sym, ordering_method, LD, work);
+}
+
+ladel_int __real_ladel_factorize_advanced_with_diag(ladel_sparse_matrix *M, ladel_diag d, ladel_symbolics *sym,
+                                                    ladel_int ordering_method, ladel_factor **LD,
+                                                    ladel_sparse_matrix *Mbasis, ladel_work *work);
+ladel_int __wrap_ladel_factorize_advanced_with_diag(ladel_sparse_matrix *M, ladel_diag d, ladel_symbolics *sym,
+                                                    ladel_int ordering_method, ladel_factor **LD,
+                                                    ladel_sparse_matrix *Mbasis, ladel_work *work) {
+    ++factorizations;
+    return __real_ladel_factorize_advanced_with_diag(M, d, sym, ordering_method, LD, Mbasis, work);
+}
+
+ladel_int __real_ladel_factorize_with_prior_basis_with_diag(ladel_sparse_matrix *M, ladel_diag d,
+                                                            ladel_symbolics *sym, ladel_factor *LD,
+                                                            ladel_work *work);
+ladel_int __wrap_ladel_factorize_with_prior_basis_with_diag(ladel_sparse_matrix *M, ladel_diag d,
+                                                            ladel_symbolics *sym, ladel_factor *LD,
+                                                            ladel_work *work) {
+    ++factorizations;
+    return __real_ladel_factorize_with_prior_basis_with_diag(M, d, sym, LD, work);
+}
+
+ladel_int __real_ladel_row_add(ladel_factor *LD, ladel_symbolics *sym, ladel_int row_in_L, ladel_sparse_matrix *W,
+                               ladel_int col_in_W, ladel_double diag, ladel_work *work);
+ladel_int __wrap_ladel_row_add(ladel_factor *LD, ladel_symbolics *sym, ladel_int row_in_L, ladel_sparse_matrix *W,
+                               ladel_int col_in_W, ladel_double diag, ladel_work *work) {
+    ++updates;
+    return __real_ladel_row_add(LD, sym, row_in_L, W, col_in_W, diag, work);
+}
+
+ladel_int __real_ladel_row_del(ladel_factor *LD, ladel_symbolics *sym, ladel_int row_in_L, ladel_work *work);
+ladel_int __wrap_ladel_row_del(ladel_factor *LD, ladel_symbolics *sym, ladel_int row_in_L, ladel_work *work) {
+    ++updates;
+    return __real_ladel_row_del(LD, sym, row_in_L, work);
+}
+
+ladel_int __real_ladel_rank1_update(ladel_factor *LD, ladel_symbolics *sym, ladel_sparse_matrix *W,
+                                    ladel_int col_in_W, ladel_double factor, ladel_int up_or_down,
+                                    ladel_work *work);
+ladel_int __wrap_ladel_rank1_update(ladel_factor *LD, ladel_symbolics *sym, ladel_sparse_matrix *W,
+                                    ladel_int col_in_W, ladel_double factor, ladel_int up_or_down,
+                                    ladel_work *work) {
+    ++updates;
+    return __real_ladel_rank1_update(LD, sym, W, col_in_W, factor, up_or_down, work);
+}
+
+static void reset_counters(void) { factorizations = updates = 0; }
+#else
+// Not counted, printed as null
+static const long factorizations = -1, updates = -1;
+static void reset_counters(void) {}
+#endif
+
+static double now(void) {
+    struct timespec t;
+    timespec_get(&t, TIME_UTC);
+    return (double)t.tv_sec + 1e-9 * (double)t.tv_nsec;
+}
+
+// Peak resident set size of this process in bytes
+static long long peak_rss(void) {
+#if defined(_WIN32)
+    PROCESS_MEMORY_COUNTERS counters;
+    if (!GetProcessMemoryInfo(GetCurrentProcess(), &counters, sizeof(counters)))
+        return -1;
+    return (long long)counters.PeakWorkingSetSize;
+#else
+    struct rusage usage;
+    if (getrusage(RUSAGE_SELF, &usage))
+        return -1;
+#if defined(__APPLE__)
+    return (long long)usage.ru_maxrss;
+#else
+    return 1024 * (long long)usage.ru_maxrss;
+#endif
+#endif
+}
+
+static int read_ints(FILE *f, c_int *x, c_int n) {
+    for (c_int k = 0; k < n; k++) {
+        long long v;
+        if (fscanf(f, "%lld", &v) != 1)
+            return FALSE;
+        x[k] = (c_int)v;
+    }
+    return TRUE;
+}
+
+static int read_floats(FILE *f, c_float *x, c_int n) {
+    for (c_int k = 0; k < n; k++) {
+        double v;
+        if (fscanf(f, "%lf", &v) != 1)
+            return FALSE;
+        x[k] = (c_float)v;
+    }
+    return TRUE;
+}
+
+static solver_sparse *read_sparse(FILE *f, c_int nrow, c_int ncol, c_int symmetry) {
+    long long nnz;
+    if (fscanf(f, "%lld", &nnz) != 1)
+        return NULL;
+    solver_sparse *M = ladel_sparse_alloc(nrow, ncol, (c_int)nnz, symmetry, TRUE, FALSE);
+    if (!read_ints(f, M->p, ncol + 1) || !read_ints(f, M->i, (c_int)nnz) || !read_floats(f, M->x, (c_int)nnz))
+        return ladel_sparse_free(M);
+    return M;
+}
+
+static QPALMData *read_problem(const char *path) {
+    FILE *f = fopen(path, "r");
+    if (!f)
+        return NULL;
+    long long n, m;
+    double c;
+    QPALMData *data = NULL;
+    if (fscanf(f, "%lld %lld %lf", &n, &m, &c) == 3) {
+        data       = (QPALMData *)qpalm_calloc(1, sizeof(QPALMData));
+        data->n    = (size_t)n;
+        data->m    = (size_t)m;
+        data->c    = (c_float)c;
+        data->q    = (c_float *)qpalm_calloc((c_int)n, sizeof(c_float));
+        data->bmin = (c_float *)qpalm_calloc((c_int)m, sizeof(c_float));
+        data->bmax = (c_float *)qpalm_calloc((c_int)m, sizeof(c_float));
+        int ok     = (data->Q = read_sparse(f, (c_int)n, (c_int)n, UPPER)) != NULL &&
+                 read_floats(f, data->q, (c_int)n) &&
+                 (data->A = read_sparse(f, (c_int)m, (c_int)n, UNSYMMETRIC)) != NULL &&
+                 read_floats(f, data->bmin, (c_int)m) && read_floats(f, data->bmax, (c_int)m);
+        if (!ok) {
+            fprintf(stderr, "Invalid problem file %s\n", path);
+            exit(1);
+        }
+    }
+    fclose(f);
+    return data;
+}
+
+static void print_count(const char *name, long count) {
+    if (count >= 0)
+        printf("\"%s\": %ld", name, count);
+    else
+        printf("\"%s\": null", name);
+}
+
+static void print_result(const char *name, QPALMWorkspace *work, double solve_time) {
+    printf("\"%s\": {\"status\": \"%s\", \"solve_time\": %.9g, \"iter\": %ld, \"iter_out\": %ld, "
+           "\"objective\": %.17g, \"pri_res_norm\": %.6g, \"dua_res_norm\": %.6g, ",
+           name, work->info->status, solve_time, (long)work->info->iter, (long)work->info->iter_out,
+           (double)work->info->objective, (double)work->info->pri_res_norm, (double)work->info->dua_res_norm);
+    print_count("factorizations", factorizations);
+    printf(", ");
+    print_count("updates", updates);
+    printf("}");
+}
+
+int main(int argc, char *argv[]) {
+    if (argc < 2) {
+        fprintf(stderr, "Usage: %s <problem.txt> [time limit (s)]\n", argv[0]);
+        return 1;
+    }
+    QPALMData *data = read_problem(argv[1]);
+    if (!data) {
+        fprintf(stderr, "Unable to read %s\n", argv[1]);
+        return 1;
+    }
+    c_int n = (c_int)data->n, m = (c_int)data->m;
+
+    QPALMSettings settings;
+    qpalm_set_default_settings(&settings);
+    settings.verbose = FALSE;
+    if (argc > 2)
+        settings.time_limit = (c_float)atof(argv[2]);
+#ifndef LADEL_USE_AMD
+    // The default AMD ordering requires LADEL with AMD support
+    settings.ordering = NO_ORDERING;
+#endif
+
+    // Cold start
+    double t0            = now();
+    QPALMWorkspace *work = qpalm_setup(data, &settings);
+    double t1            = now();
+    printf("{\"n\": %ld, \"m\": %ld, \"nnz_Q\": %ld, \"nnz_A\": %ld, \"setup_time\": %.9g, ", (long)n, (long)m,
+           (long)data->Q->p[n], (long)data->A->p[n], t1 - t0);
+    print_count("setup_factorizations", factorizations);
+    printf(", ");
+    reset_counters();
+    qpalm_solve(work);
+    double t2 = now();
+    print_result("cold", work, t2 - t1);
+
+    // Warm start: small deterministic perturbation of q, starting from the
+    // cold solution
+    c_float *x = (c_float *)qpalm_calloc(n, sizeof(c_float));
+    c_float *y = (c_float *)qpalm_calloc(m, sizeof(c_float));
+    for (c_int k = 0; k < n; k++)
+        x[k] = work->solution->x[k];
+    for (c_int k = 0; k < m; k++)
+        y[k] = work->solution->y[k];
+    unsigned seed = 12345;
+    for (c_int k = 0; k < n; k++) {
+        seed        = 1103515245u * seed + 12345u;
+        c_float u   = (c_float)((seed >> 16) & 0x7FFF) / (c_float)0x7FFF * 2 - 1;
+        c_float qk  = data->q[k];
+        data->q[k] += (c_float)1e-3 * (1 + (qk < 0 ? -qk : qk)) * u;
+    }
+    reset_counters();
+    double t3 = now();
+    qpalm_update_q(work, data->q);
+    qpalm_warm_start(work, x, y);
+    qpalm_solve(work);
+    double t4 = now();
+    printf(", ");
+    print_result("warm", work, t4 - t3);
+    printf(", \"peak_rss\": %lld}\n", peak_rss());
+
+    qpalm_cleanup(work);
+    qpalm_free(x);
+    qpalm_free(y);
+    ladel_sparse_free(data->Q);
+    ladel_sparse_free(data->A);
+    qpalm_free(data->q);
+    qpalm_free(data->bmin);
+    qpalm_free(data->bmax);
+    qpalm_free(data);
+    return 0;
+}
@@ -9,6 +9,10 @@
 #define TRUE 1
 #define FALSE 0
 
+#if defined(EXPECT_LADEL_64BIT_INDICES) != defined(LADEL_64BIT_INDICES)
+#error "c_int does not match the long_index option of the LADEL package"
+#endif
+
 c_float *random_vector(c_int n) {
     c_float *X = (c_float *)qpalm_calloc(n, sizeof(c_float));
     for (int i = 0; i < n; i++)
@@ -63,6 +67,10 @@ int main() {
 
     // Define Solver settings as default
     qpalm_set_default_settings(settings);
+#ifndef LADEL_USE_AMD
+    // The default AMD ordering requires LADEL with AMD support
+    settings->ordering = NO_ORDERING;
+#endif
 
     // Setup workspace
     work = qpalm_setup(data, settings);
@@ -72,6 +80,7 @@ int main() {
 
     printf("Solver status: ");
     puts(work->info->status);
+    printf("Index size: %d bits\n", (int)(8 * sizeof(c_int)));
     printf("Iter: %d\n", (int)work->info->iter);
     printf("Iter Out: %d\n", (int)work->info->iter_out);
     printf("Solution:");
@@ -0,0 +1,82 @@
+import os
+
+from conan import ConanFile
+from conan.tools.build import build_jobs
+from conan.tools.cmake import CMake
+
+
+# Helpers shared by the recipes in this repository. Use them through
+# python_requires = "tttapa-conan-utils/1.0.0" and
+# self.python_requires["tttapa-conan-utils"].module.
+
+# OpenMP runtime for each compiler, unless the user.openmp:runtime conf
+# selects a runtime for the whole graph
+default_openmp_runtime = {
+    "gcc": "libgomp",
+    "clang": "libomp",
+    "apple-clang": "libomp",
+}
+
+# llvm-openmp version used for libomp with compilers other than Clang (Clang
+# uses the release matching its own version), see recipes/llvm-openmp/config.yml
+llvm_openmp_version = "22.1.0"
+
+
+def openmp_runtime(conanfile, default=None):
+    """Returns the OpenMP runtime selected by the user.openmp:runtime conf, or
+    the default runtime of the compiler (default for other compilers)."""
+    default = default_openmp_runtime.get(str(conanfile.settings.compiler), default)
+    return conanfile.conf.get("user.openmp:runtime", default=default, choices=["libgomp", "libomp"])
+
+
+def llvm_openmp_requirement(conanfile):
+    """Returns the llvm-openmp reference to require for the libomp runtime."""
+    if conanfile.settings.compiler == "clang":
+        return f"llvm-openmp/[~{conanfile.settings.compiler.version}]"
+    return f"llvm-openmp/{llvm_openmp_version}"
+
+
+def define_openmp_thread_budget(conanfile):
+    """Sets the number of OpenMP threads of the runtime environment to the
+    user.threads:budget conf, the thread budget shared by all packages in the
+    graph. Returns the budget (None if unset)."""
+    threads = conanfile.conf.get("user.threads:budget", check_type=int)
+    if threads:
+        conanfile.runenv_info.define("OMP_NUM_THREADS", str(threads))
+        conanfile.runenv_info.define("OMP_WAIT_POLICY", "PASSIVE")
+    return threads
+
+
+def cmake_configure(conanfile, build_folder, variables=None, build_script_folder=None):
+    """CMake.configure() in the given build folder rather than
+    conanfile.build_folder, for recipes that build the same project several
+    times. The experimental subfolder argument of CMake.configure() is not
+    available in older Conan versions such as 2.15."""
+    # The toolchain file in the presets is relative to conanfile.build_folder
+    toolchain = os.path.join(conanfile.generators_folder, "conan_toolchain.cmake")
+    cli_args = [f'-B "{build_folder}"', f'-DCMAKE_TOOLCHAIN_FILE="{toolchain}"']
+    cmake = CMake(conanfile)
+    cmake.configure(variables=variables, build_script_folder=build_script_folder,
+                    cli_args=[arg.replace("\\", "/") for arg in cli_args])
+
+
+def cmake_build(conanfile, build_folder):
+    """CMake.build() for a folder configured by cmake_configure()."""
+    cmake_program = conanfile.conf.get("tools.cmake:cmake_program", default="cmake")
+    jobs = build_jobs(conanfile)
+    parallel = f" --parallel {jobs}" if jobs else ""
+    conanfile.run(f'{cmake_program} --build "{build_folder}" --config {conanfile.settings.build_type}{parallel}')
+
+
+def cmake_install(conanfile, build_folder, prefix):
+    """CMake.install() for a folder configured by cmake_configure()."""
+    cmake_program = conanfile.conf.get("tools.cmake:cmake_program", default="cmake")
+    conanfile.run(f'{cmake_program} --install "{build_folder}" --config {conanfile.settings.build_type} --prefix "{prefix}"')
+
+
+class TttapaConanUtilsRecipe(ConanFile):
+    name = "tttapa-conan-utils"
+    package_type = "python-require"
+
+    author = "Pieter P <pieter.p.dev@outlook.com>"
+    description = "Helpers shared by the recipes in this repository."